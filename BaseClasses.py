@@ -6,6 +6,8 @@ import functools
 import logging
 import random
 import secrets
+import sys
+import time
 import typing  # this can go away when Python 3.8 support is dropped
 from argparse import Namespace
 from collections import Counter, deque
@@ -20,6 +22,7 @@ import Utils
 
 if typing.TYPE_CHECKING:
     from worlds import AutoWorld
+    from Profiler import GenerationProfiler
 
 
 class Group(TypedDict, total=False):
@@ -34,6 +37,20 @@ class Group(TypedDict, total=False):
     link_replacement: bool
 
 
+class SphereIndex(NamedTuple):
+    """Result of sweeping all filled locations of a multiworld from an empty CollectionState."""
+    spheres: List[Set[Location]]
+    """
+    locations reachable in each step, including the empty and unreachable sets at the end if there are any.
+    Only progression counts for logic, so unlike MultiWorld.get_spheres, items of other locations don't unlock anything.
+    """
+    states: List[CollectionState]
+    """
+    states[n] is the state spheres[n] was collected from, states[-1] the state after all reachable spheres.
+    They are shared with other callers and threads, so they must only be used through a copy.
+    """
+
+
 class ThreadBarrierProxy:
     """Passes through getattr while passthrough is True"""
     def __init__(self, obj: object) -> None:
@@ -61,6 +78,10 @@ class MultiWorld():
     is_race: bool = False
     precollected_items: Dict[int, List[Item]]
     state: CollectionState
+    _sphere_index: Optional[SphereIndex] = None
+    _spheres: Optional[List[Set[Location]]] = None
+    profiler: Optional[GenerationProfiler] = None
+    """set by Main when generating with --profile, see Profiler.py"""
 
     plando_options: PlandoOptions
     accessibility: Dict[int, Options.Accessibility]
@@ -388,10 +409,12 @@ class MultiWorld():
     def push_precollected(self, item: Item):
         self.precollected_items[item.player].append(item)
         self.state.collect(item, True)
+        self.invalidate_sphere_index()
 
     def push_item(self, location: Location, item: Item, collect: bool = True):
         location.item = item
         item.location = location
+        self.invalidate_sphere_index()
         if collect:
             self.state.collect(item, location.advancement, location)
 
@@ -464,7 +487,7 @@ class MultiWorld():
         else:
             if self.has_beaten_game(self.state):
                 return True
-            state = CollectionState(self)
+            return self.has_beaten_game(self.get_sphere_index().states[-1].copy())
         prog_locations = {location for location in self.get_locations() if location.item
                           and location.item.advancement and location not in state.locations_checked}
 
@@ -496,9 +519,48 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
+
+        The spheres are cached and shared with other callers, so they should not be modified.
+        They are dropped together with the sphere index, see get_sphere_index.
         """
+        spheres = self._spheres
+        if spheres is None:
+            spheres = self._spheres = []
+            state = CollectionState(self)
+            locations = set(self.get_filled_locations())
+
+            while locations:
+                sphere: Set[Location] = set()
+
+                for location in locations:
+                    if location.can_reach(state):
+                        sphere.add(location)
+                spheres.append(sphere)
+                if not sphere:
+                    if locations:
+                        spheres.append(locations)  # unreachable locations
+                    break
+
+                for location in sphere:
+                    state.collect(location.item, True, location)
+                locations -= sphere
+
+        return iter(spheres)
+
+    def get_sphere_index(self) -> SphereIndex:
+        """
+        Sweeps all filled locations once and caches the result until items get placed with push_item,
+        push_precollected, Location.place_locked_item or Fill.swap_location_item, and after each world method called
+        through AutoWorld.call_all, call_single or call_stage before output.
+        Code assigning Location.item directly has to call invalidate_sphere_index itself.
+        """
+        sphere_index = self._sphere_index
+        if sphere_index:
+            return sphere_index
+
         state = CollectionState(self)
         locations = set(self.get_filled_locations())
+        sphere_index = SphereIndex([], [state.copy()])
 
         while locations:
             sphere: Set[Location] = set()
@@ -506,20 +568,30 @@ class MultiWorld():
             for location in locations:
                 if location.can_reach(state):
                     sphere.add(location)
-            yield sphere
+            sphere_index.spheres.append(sphere)
             if not sphere:
                 if locations:
-                    yield locations  # unreachable locations
+                    sphere_index.spheres.append(locations)  # unreachable locations
                 break
 
             for location in sphere:
-                state.collect(location.item, True, location)
+                if location.advancement:
+                    state.collect(location.item, True, location)
+                else:
+                    # only progression counts for logic, same as for playthrough and can_beat_game
+                    state.locations_checked.add(location)
             locations -= sphere
+            sphere_index.states.append(state.copy())
+
+        self._sphere_index = sphere_index
+        return sphere_index
+
+    def invalidate_sphere_index(self) -> None:
+        self._sphere_index = None
+        self._spheres = None
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
-        if not state:
-            state = CollectionState(self)
         players: Dict[str, Set[int]] = {
             "minimal": set(),
             "items": set(),
@@ -554,6 +626,23 @@ class MultiWorld():
 
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
+        if not state and not any(location.advancement and not location_relevant(location)
+                                 for location in self.get_filled_locations()):
+            # the shared sweep only counts progression, which all sits in relevant locations here,
+            # so everything that can be reached from an empty state is already known
+            sphere_index = self.get_sphere_index()
+            state = sphere_index.states[-1].copy()
+            reached = set().union(*sphere_index.spheres[:len(sphere_index.states) - 1])
+            missing = [location for location in locations if location_condition(location) and
+                       (location not in reached if location.item else not location.can_reach(state))]
+            if missing:
+                logging.warning(f"Could not access required locations for accessibility check."
+                                f" Missing: {missing}")
+                return False
+            return self.has_beaten_game(state)
+
+        if not state:
+            state = CollectionState(self)
         while locations:
             sphere: List[Location] = []
             for n in range(len(locations) - 1, -1, -1):
@@ -581,6 +670,53 @@ class MultiWorld():
 
 PathValue = Tuple[str, Optional["PathValue"]]
 
+_STALE_BY_ITEMS: Any = object()
+"""Value of CollectionState.stale for a player that only went stale by collecting items since its last update.
+Everything else that marks a player stale sets True, which makes update_reachable_regions retry every Entrance."""
+
+
+class CopyOnWriteDict(dict):
+    """
+    dict of mutable containers (Counters, sets, ...), which are shared with copies of it until they get mutated.
+    Accessing a container through [] copies it first if it is shared, so that it can be safely mutated afterwards.
+    Use get() for read-only access, it never copies.
+    A container taken through [] must not be kept across copy(), as it is shared with the copy from then on and writing
+    to it would change both. Take it through [] again after copying.
+    """
+    owned: Dict[Any, int]
+    """keys of the containers only this dict holds, with the generation they became owned in"""
+    generation: int
+    """increased by copy(), any container owned in an older generation is shared again"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.generation = 0
+        self.owned = dict.fromkeys(dict.keys(self), 0)
+
+    def __getitem__(self, key: Any) -> Any:
+        value = dict.__getitem__(self, key)
+        if self.owned.get(key) != self.generation:
+            value = value.copy()
+            dict.__setitem__(self, key, value)
+            self.owned[key] = self.generation
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        dict.__setitem__(self, key, value)
+        self.owned[key] = self.generation
+
+    def __delitem__(self, key: Any) -> None:
+        dict.__delitem__(self, key)
+        self.owned.pop(key, None)
+
+    def copy(self) -> CopyOnWriteDict:
+        # all containers are shared with the copy from now on, so neither side owns them anymore,
+        # moving on to the next generation says so without touching the containers or owned of this dict
+        self.generation += 1
+        ret = CopyOnWriteDict()
+        dict.update(ret, self)
+        return ret
+
 
 class CollectionState():
     prog_items: Dict[int, Counter[str]]
@@ -591,18 +727,20 @@ class CollectionState():
     path: Dict[Union[Region, Entrance], PathValue]
     locations_checked: Set[Location]
     stale: Dict[int, bool]
+    stale_items: Dict[int, Set[str]]
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld):
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.prog_items = CopyOnWriteDict({player: Counter() for player in parent.get_all_ids()})
         self.multiworld = parent
-        self.reachable_regions = {player: set() for player in parent.get_all_ids()}
-        self.blocked_connections = {player: set() for player in parent.get_all_ids()}
+        self.reachable_regions = CopyOnWriteDict({player: set() for player in parent.get_all_ids()})
+        self.blocked_connections = CopyOnWriteDict({player: set() for player in parent.get_all_ids()})
         self.events = set()
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.stale_items = CopyOnWriteDict({player: set() for player in parent.get_all_ids()})
         for function in self.additional_init_functions:
             function(self, parent)
         for items in parent.precollected_items.values():
@@ -610,10 +748,22 @@ class CollectionState():
                 self.collect(item, True)
 
     def update_reachable_regions(self, player: int):
+        profiler = self.multiworld.profiler
+        start_time = time.perf_counter() if profiler else 0.0
+        # anything but collected items, like a world marking the player stale, may have changed any access rule
+        stale_by_items = self.stale[player] is _STALE_BY_ITEMS
         self.stale[player] = False
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
-        queue = deque(self.blocked_connections[player])
+        stale_items = self.stale_items[player]
+        if stale_by_items and stale_items and self.multiworld.worlds[player].incremental_reachability:
+            # only retry connections that declared a dependency on one of the items collected since the last update
+            queue = deque(connection for connection in blocked_connections
+                          if connection.item_dependencies is None
+                          or not stale_items.isdisjoint(connection.item_dependencies))
+        else:
+            queue = deque(blocked_connections)
+        stale_items.clear()
         start = self.multiworld.get_region("Menu", player)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
@@ -641,20 +791,35 @@ class CollectionState():
                     if new_entrance in blocked_connections and new_entrance not in queue:
                         queue.append(new_entrance)
 
+        if profiler:
+            profiler.add_reachability(player, time.perf_counter() - start_time)
+
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
-        ret.prog_items = copy.deepcopy(self.prog_items)
-        ret.reachable_regions = {player: copy.copy(self.reachable_regions[player]) for player in
-                                 self.reachable_regions}
-        ret.blocked_connections = {player: copy.copy(self.blocked_connections[player]) for player in
-                                   self.blocked_connections}
+        # skip __init__, as everything it would create gets replaced anyway
+        ret = CollectionState.__new__(CollectionState)
+        ret.multiworld = self.multiworld
+        # per-player data is shared with the copy until either side mutates it, see CopyOnWriteDict
+        ret.prog_items = self.__copy_per_player(self.prog_items)
+        ret.reachable_regions = self.__copy_per_player(self.reachable_regions)
+        ret.blocked_connections = self.__copy_per_player(self.blocked_connections)
+        ret.stale_items = self.__copy_per_player(self.stale_items)
+        ret.stale = self.stale.copy()
         ret.events = copy.copy(self.events)
         ret.path = copy.copy(self.path)
         ret.locations_checked = copy.copy(self.locations_checked)
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
 
+    @staticmethod
+    def __copy_per_player(data: Dict[int, Any]) -> Dict[int, Any]:
+        if isinstance(data, CopyOnWriteDict):
+            return data.copy()
+        # replaced from the outside, fall back to copying everything
+        return CopyOnWriteDict({player: copy.copy(value) for player, value in data.items()})
+
     def can_reach(self,
                   spot: Union[Location, Entrance, Region, str],
                   resolution_hint: Optional[str] = None,
@@ -681,6 +846,9 @@ class CollectionState():
         return self.multiworld.get_region(spot, player).can_reach(self)
 
     def sweep_for_events(self, key_only: bool = False, locations: Optional[Iterable[Location]] = None) -> None:
+        profiler = self.multiworld.profiler
+        start_time = time.perf_counter() if profiler else 0.0
+        rounds = 0
         if locations is None:
             locations = self.multiworld.get_filled_locations()
         reachable_events = True
@@ -688,6 +856,7 @@ class CollectionState():
         locations = {location for location in locations if location.advancement and location not in self.events and
                      not key_only or getattr(location.item, "locked_dungeon_item", False)}
         while reachable_events:
+            rounds += 1
             reachable_events = {location for location in locations if location.can_reach(self)}
             locations -= reachable_events
             for event in reachable_events:
@@ -695,35 +864,42 @@ class CollectionState():
                 assert isinstance(event.item, Item), "tried to collect Event with no Item"
                 self.collect(event.item, True, event)
 
-    # item name related
+        if profiler:
+            profiler.add_sweep(rounds, time.perf_counter() - start_time)
+
+    # item name related, read through get() to not copy shared data, see CopyOnWriteDict
     def has(self, item: str, player: int, count: int = 1) -> bool:
-        return self.prog_items[player][item] >= count
+        return self.prog_items.get(player).get(item, 0) >= count
 
     def has_all(self, items: Iterable[str], player: int) -> bool:
         """Returns True if each item name of items is in state at least once."""
-        return all(self.prog_items[player][item] for item in items)
+        player_prog_items = self.prog_items.get(player)
+        return all(player_prog_items.get(item, 0) for item in items)
 
     def has_any(self, items: Iterable[str], player: int) -> bool:
         """Returns True if at least one item name of items is in state at least once."""
-        return any(self.prog_items[player][item] for item in items)
+        player_prog_items = self.prog_items.get(player)
+        return any(player_prog_items.get(item, 0) for item in items)
 
     def has_all_counts(self, item_counts: Mapping[str, int], player: int) -> bool:
         """Returns True if each item name is in the state at least as many times as specified."""
-        return all(self.prog_items[player][item] >= count for item, count in item_counts.items())
+        player_prog_items = self.prog_items.get(player)
+        return all(player_prog_items.get(item, 0) >= count for item, count in item_counts.items())
 
     def has_any_count(self, item_counts: Mapping[str, int], player: int) -> bool:
         """Returns True if at least one item name is in the state at least as many times as specified."""
-        return any(self.prog_items[player][item] >= count for item, count in item_counts.items())
+        player_prog_items = self.prog_items.get(player)
+        return any(player_prog_items.get(item, 0) >= count for item, count in item_counts.items())
 
     def count(self, item: str, player: int) -> int:
-        return self.prog_items[player][item]
+        return self.prog_items.get(player).get(item, 0)
 
     def has_from_list(self, items: Iterable[str], player: int, count: int) -> bool:
         """Returns True if the state contains at least `count` items matching any of the item names from a list."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items.get(player)
         for item_name in items:
-            found += player_prog_items[item_name]
+            found += player_prog_items.get(item_name, 0)
             if found >= count:
                 return True
         return False
@@ -732,28 +908,30 @@ class CollectionState():
         """Returns True if the state contains at least `count` items matching any of the item names from a list.
         Ignores duplicates of the same item."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items.get(player)
         for item_name in items:
-            found += player_prog_items[item_name] > 0
+            found += player_prog_items.get(item_name, 0) > 0
             if found >= count:
                 return True
         return False
 
     def count_from_list(self, items: Iterable[str], player: int) -> int:
         """Returns the cumulative count of items from a list present in state."""
-        return sum(self.prog_items[player][item_name] for item_name in items)
+        player_prog_items = self.prog_items.get(player)
+        return sum(player_prog_items.get(item_name, 0) for item_name in items)
     
     def count_from_list_unique(self, items: Iterable[str], player: int) -> int:
         """Returns the cumulative count of items from a list present in state. Ignores duplicates of the same item."""
-        return sum(self.prog_items[player][item_name] > 0 for item_name in items)
+        player_prog_items = self.prog_items.get(player)
+        return sum(player_prog_items.get(item_name, 0) > 0 for item_name in items)
 
     # item name group related
     def has_group(self, item_name_group: str, player: int, count: int = 1) -> bool:
         """Returns True if the state contains at least `count` items present in a specified item group."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items.get(player)
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
-            found += player_prog_items[item_name]
+            found += player_prog_items.get(item_name, 0)
             if found >= count:
                 return True
         return False
@@ -763,27 +941,27 @@ class CollectionState():
         Ignores duplicates of the same item.
         """
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items.get(player)
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
-            found += player_prog_items[item_name] > 0
+            found += player_prog_items.get(item_name, 0) > 0
             if found >= count:
                 return True
         return False
 
     def count_group(self, item_name_group: str, player: int) -> int:
         """Returns the cumulative count of items from an item group present in state."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items.get(player)
         return sum(
-            player_prog_items[item_name]
+            player_prog_items.get(item_name, 0)
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
         )
 
     def count_group_unique(self, item_name_group: str, player: int) -> int:
         """Returns the cumulative count of items from an item group present in state.
         Ignores duplicates of the same item."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items.get(player)
         return sum(
-            player_prog_items[item_name] > 0
+            player_prog_items.get(item_name, 0) > 0
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
         )
 
@@ -792,30 +970,56 @@ class CollectionState():
         if location:
             self.locations_checked.add(location)
 
-        changed = self.multiworld.worlds[item.player].collect(self, item)
+        world = self.multiworld.worlds[item.player]
+        changed = world.collect(self, item)
 
         if not changed and event:
             self.prog_items[item.player][item.name] += 1
             changed = True
 
-        self.stale[item.player] = True
+        if world.incremental_reachability:
+            self.stale_items[item.player].add(item.name)
+            if not self.stale[item.player]:
+                self.stale[item.player] = _STALE_BY_ITEMS
+        else:
+            self.stale[item.player] = True
 
         if changed and not event:
             self.sweep_for_events()
 
         return changed
 
-    def remove(self, item: Item):
-        changed = self.multiworld.worlds[item.player].remove(self, item)
+    def remove(self, item: Item, event: bool = False) -> bool:
+        """Undo collect(). Pass the same event flag that was used to collect the item."""
+        world = self.multiworld.worlds[item.player]
+        changed = world.remove(self, item)
+
+        if not changed and event:
+            player_prog_items = self.prog_items[item.player]
+            player_prog_items[item.name] -= 1
+            if player_prog_items[item.name] < 1:
+                del player_prog_items[item.name]
+            changed = True
+
         if changed:
+            if world.incremental_reachability and all(
+                    entrance.item_dependencies is not None and item.name not in entrance.item_dependencies
+                    for entrance in self.multiworld.get_entrances(item.player)):
+                # no entrance of this world can depend on the removed item, reachability is unaffected
+                return changed
             # invalidate caches, nothing can be trusted anymore now
             self.reachable_regions[item.player] = set()
             self.blocked_connections[item.player] = set()
             self.stale[item.player] = True
 
+        return changed
+
 
 class Entrance:
     access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
+    item_dependencies: Optional[typing.AbstractSet[str]] = None
+    """Names of all Items whose collection can change the result of access_rule, used by worlds with
+    incremental_reachability. None means unknown, so the Entrance gets retried on every update."""
     hide_path: bool = False
     player: int
     name: str
@@ -946,7 +1150,7 @@ class Region:
     def can_reach(self, state: CollectionState) -> bool:
         if state.stale[self.player]:
             state.update_reachable_regions(self.player)
-        return self in state.reachable_regions[self.player]
+        return self in state.reachable_regions.get(self.player)
 
     @property
     def hint_text(self) -> str:
@@ -1047,10 +1251,14 @@ class Location:
 
     def can_fill(self, state: CollectionState, item: Item, check_access=True) -> bool:
         return ((self.always_allow(state, item) and item.name not in state.multiworld.worlds[item.player].options.non_local_items)
-                or ((self.progress_type != LocationProgressType.EXCLUDED or not (item.advancement or item.useful))
+                or (self.allows_classification(item)
                     and self.item_rule(item)
                     and (not check_access or self.can_reach(state))))
 
+    def allows_classification(self, item: Item) -> bool:
+        """Whether the progress type allows item, excluded locations take no progression or useful items."""
+        return self.progress_type != LocationProgressType.EXCLUDED or not (item.advancement or item.useful)
+
     def can_reach(self, state: CollectionState) -> bool:
         # self.access_rule computes faster on average, so placing it first for faster abort
         assert self.parent_region, "Can't reach location without region"
@@ -1062,6 +1270,8 @@ class Location:
         self.item = item
         item.location = self
         self.locked = True
+        if self.parent_region and self.parent_region.multiworld:
+            self.parent_region.multiworld.invalidate_sphere_index()
 
     def __repr__(self):
         return self.__str__()
@@ -1121,7 +1331,8 @@ class Item:
     location: Optional[Location]
 
     def __init__(self, name: str, classification: ItemClassification, code: Optional[int], player: int):
-        self.name = name
+        # interned, so that looking it up in dicts keyed by the same name usually only needs an identity check
+        self.name = sys.intern(name) if type(name) is str else name
         self.classification = classification
         self.player = player
         self.code = code
@@ -1218,18 +1429,15 @@ class Spoiler:
         prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
         state_cache: List[Optional[CollectionState]] = [None]
         collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
         sphere_candidates = set(prog_locations)
         logging.debug('Building up collection spheres.')
-        while sphere_candidates:
-
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
-            for location in sphere:
-                state.collect(location.item, True, location)
+        # the shared sphere index also contains locations of non-progression items,
+        # which are not counted by its states, so we only have to filter them out
+        sphere_index = multiworld.get_sphere_index()
+        for sphere, state in zip(sphere_index.spheres, sphere_index.states[1:]):
+            sphere = sphere & sphere_candidates
+            if not sphere:
+                break
 
             sphere_candidates -= sphere
             collection_spheres.append(sphere)
@@ -1238,34 +1446,44 @@ class Spoiler:
             logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
                           len(sphere),
                           len(prog_locations))
-            if not sphere:
-                logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
-                    location.item.name, location.item.player, location.name, location.player) for location in
-                                                                               sphere_candidates])
-                if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in sphere_candidates]):
-                    raise RuntimeError(f'Not all progression items reachable ({sphere_candidates}). '
-                                       f'Something went terribly wrong here.')
-                else:
-                    self.unreachables = sphere_candidates
-                    break
+
+        if sphere_candidates:
+            collection_spheres.append(set())
+            state_cache.append(sphere_index.states[-1].copy())
+            logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
+                location.item.name, location.item.player, location.name, location.player) for location in
+                                                                           sphere_candidates])
+            if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in sphere_candidates]):
+                raise RuntimeError(f'Not all progression items reachable ({sphere_candidates}). '
+                                   f'Something went terribly wrong here.')
+            else:
+                self.unreachables = sphere_candidates
 
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
+        # as items only ever get removed from here on, an item that was found to be required stays required,
+        # and so does any other copy of it that is available at the same time or later
         restore_later = {}
+        required_items: Set[Tuple[int, str]] = set()
         for num, sphere in reversed(tuple(enumerate(collection_spheres))):
             to_delete = set()
             for location in sphere:
+                if (location.item.player, location.item.name) in required_items:
+                    logging.debug('%s (Player %d) is known to be required to beat the game.', location.item.name,
+                                  location.item.player)
+                    continue
                 # we remove the item at location and check if game is still beatable
                 logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
                               location.item.player)
                 old_item = location.item
                 location.item = None
-                if multiworld.can_beat_game(state_cache[num]):
+                if self._can_beat_game(state_cache[num], collection_spheres[num:]):
                     to_delete.add(location)
                     restore_later[location] = old_item
                 else:
                     # still required, got to keep it around
                     location.item = old_item
+                    required_items.add((old_item.player, old_item.name))
 
             # cull entries in spheres for spoiler walkthrough at end
             sphere -= to_delete
@@ -1276,7 +1494,7 @@ class Spoiler:
             logging.debug('Checking if %s (Player %d) is required to beat the game.', item.name, item.player)
             multiworld.precollected_items[item.player].remove(item)
             multiworld.state.remove(item)
-            if not multiworld.can_beat_game():
+            if (item.player, item.name) in required_items or not self._can_beat_game(None, collection_spheres):
                 multiworld.push_precollected(item)
             else:
                 removed_precollected.append(item)
@@ -1325,6 +1543,47 @@ class Spoiler:
         for item in removed_precollected:
             multiworld.push_precollected(item)
 
+    def _can_beat_game(self, starting_state: Optional[CollectionState],
+                       collection_spheres: List[Set[Location]]) -> bool:
+        """
+        Same as MultiWorld.can_beat_game, but only looks at the locations of collection_spheres that still have an item,
+        which have to contain every progression location not yet collected by starting_state.
+        Locations are tried in sphere order, so that most of them are collected in a single pass,
+        instead of retrying every remaining location for each new sphere.
+        """
+        multiworld = self.multiworld
+        if starting_state:
+            if multiworld.has_beaten_game(starting_state):
+                return True
+            state = starting_state.copy()
+        else:
+            if multiworld.has_beaten_game(multiworld.state):
+                return True
+            state = CollectionState(multiworld)
+
+        unreached: List[Location] = []
+        for sphere in collection_spheres:
+            reachable = []
+            for location in sphere:
+                if location.item and location not in state.locations_checked:
+                    if location.can_reach(state):
+                        reachable.append(location)
+                    else:
+                        unreached.append(location)
+            for location in reachable:
+                state.collect(location.item, True, location)
+
+        while True:
+            if multiworld.has_beaten_game(state):
+                return True
+            reachable = [location for location in unreached if location.can_reach(state)]
+            if not reachable:
+                # ran out of places and did not finish yet, quit
+                return False
+            for location in reachable:
+                state.collect(location.item, True, location)
+            unreached = [location for location in unreached if location not in state.locations_checked]
+
     def create_paths(self, state: CollectionState, collection_spheres: List[Set[Location]]) -> None:
         from itertools import zip_longest
         multiworld = self.multiworld
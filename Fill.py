@@ -1,3 +1,4 @@
+import bisect
 import collections
 import itertools
 import logging
@@ -7,7 +8,7 @@ from collections import Counter, deque
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
 from Options import Accessibility
 
-from worlds.AutoWorld import call_all
+from worlds.AutoWorld import World, call_all
 from worlds.generic.Rules import add_item_rule
 
 
@@ -28,6 +29,112 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+def _can_remove(world: World) -> bool:
+    """Whether remove() is known to exactly undo collect() for this world, which is only the case for the defaults."""
+    world_type = type(world)
+    return world_type.collect is World.collect and world_type.remove is World.remove
+
+
+class PlacementCache:
+    """
+    Finds the first location of fill_restrictive's location list that can be filled with an item.
+
+    Locations are grouped by player, item_rule and progress type. Each group's item_rule is called once per item and
+    groups that can not take the item are skipped as a whole, only the rest is checked for reachability, which is
+    cached per location until reset. Locations with their own can_fill or always_allow are checked one by one.
+    """
+    UNKNOWN, REACHABLE, UNREACHABLE = 0, 1, 2
+
+    GroupKey = typing.Tuple[int, typing.Optional[typing.Callable[[Item], bool]], LocationProgressType]
+
+    def __init__(self, locations: typing.List[Location]) -> None:
+        self.locations = locations  # shared with fill_restrictive, filled locations get removed through remove
+        self.ordered_locations = list(locations)
+        self.ordinals = {location: i for i, location in enumerate(locations)}
+        self.reachability = bytearray(len(locations))
+        self.removed_tree = [0] * (len(locations) + 1)  # Fenwick tree of removed ordinals, to find list positions
+        self.keys = [self.group_key(location) for location in locations]
+        self.groups: typing.Dict[PlacementCache.GroupKey, typing.List[int]] = {}  # key -> ascending ordinals
+        for ordinal, key in enumerate(self.keys):
+            self.groups.setdefault(key, []).append(ordinal)
+        self.item: typing.Optional[Item] = None
+        self.item_rules: typing.Dict[typing.Callable[[Item], bool], bool] = {}
+
+    @staticmethod
+    def group_key(location: Location) -> "PlacementCache.GroupKey":
+        if type(location).can_fill is not Location.can_fill or location.always_allow is not Location.always_allow:
+            return location.player, None, location.progress_type
+        return location.player, location.item_rule, location.progress_type
+
+    def reset(self) -> None:
+        """Forget cached reachability, has to be called whenever the state used for placement changes."""
+        self.reachability = bytearray(len(self.reachability))
+
+    def can_reach(self, ordinal: int, state: CollectionState) -> bool:
+        known = self.reachability[ordinal]
+        if known == self.UNKNOWN:
+            reachable = self.ordered_locations[ordinal].can_reach(state)
+            known = self.reachability[ordinal] = self.REACHABLE if reachable else self.UNREACHABLE
+        return known == self.REACHABLE
+
+    def item_rule(self, rule: typing.Callable[[Item], bool], item: Item) -> bool:
+        if item is not self.item:
+            self.item = item
+            self.item_rules = {}
+        allowed = self.item_rules.get(rule)
+        if allowed is None:
+            allowed = self.item_rules[rule] = rule(item)
+        return allowed
+
+    def never_fills(self, location: Location, item: Item) -> bool:
+        """Whether location.can_fill is False for item in any state, to skip work that can only lead to a failure."""
+        rule = self.group_key(location)[1]
+        return rule is not None and not (location.allows_classification(item) and self.item_rule(rule, item))
+
+    def find(self, state: CollectionState, item: Item, check_access: bool = True,
+             player: typing.Optional[int] = None) -> typing.Optional[Location]:
+        """Returns the first remaining location that can_fill item, only looking at locations of player if given."""
+        best = len(self.ordered_locations)
+        for (group_player, rule, _), ordinals in self.groups.items():
+            if not ordinals or ordinals[0] >= best or (player is not None and group_player != player):
+                continue
+            if rule is None:
+                for ordinal in ordinals:
+                    if ordinal >= best:
+                        break
+                    if self.ordered_locations[ordinal].can_fill(state, item, check_access):
+                        best = ordinal
+                        break
+            elif self.ordered_locations[ordinals[0]].allows_classification(item) and self.item_rule(rule, item):
+                if not check_access:
+                    best = ordinals[0]
+                    continue
+                for ordinal in ordinals:
+                    if ordinal >= best:
+                        break
+                    if self.can_reach(ordinal, state):
+                        best = ordinal
+                        break
+        return self.ordered_locations[best] if best < len(self.ordered_locations) else None
+
+    def remove(self, location: Location) -> None:
+        """Removes location from the shared location list, after it got filled."""
+        ordinal = self.ordinals[location]
+        ordinals = self.groups[self.keys[ordinal]]
+        del ordinals[bisect.bisect_left(ordinals, ordinal)]
+        tree = self.removed_tree
+        position = ordinal
+        i = ordinal
+        while i > 0:
+            position -= tree[i]
+            i -= i & -i
+        i = ordinal + 1
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+        self.locations.pop(position)
+
+
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
@@ -53,6 +160,13 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     for item in item_pool:
         reachable_items.setdefault(item.player, deque()).append(item)
 
+    placement_cache = PlacementCache(locations)
+
+    # base_state with everything in item_pool and unplaced_items collected, kept up to date across rounds by
+    # removing items as they get taken from the pool, instead of collecting the entire pool again every round
+    pool_state: typing.Optional[CollectionState] = None
+    pool_state_unplaced = 0
+
     # for progress logging
     total = min(len(item_pool), len(locations))
     placed = 0
@@ -66,9 +180,20 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                 if pool_item is item:
                     item_pool.pop(p)
                     break
-        maximum_exploration_state = sweep_from_pool(
-            base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
-            if single_player_placement else None)
+        if pool_state and all(_can_remove(multiworld.worlds[item.player]) for item in items_to_place):
+            for item in items_to_place:
+                pool_state.remove(item, True)
+            for unplaced_item in unplaced_items[pool_state_unplaced:]:
+                pool_state.collect(unplaced_item, True)
+        else:
+            pool_state = sweep_from_pool(base_state, item_pool + unplaced_items, [])
+        pool_state_unplaced = len(unplaced_items)
+        maximum_exploration_state = pool_state.copy()
+        # single player placement only has items of one player to place
+        maximum_exploration_state.sweep_for_events(
+            locations=multiworld.get_filled_locations(items_to_place[0].player) if single_player_placement else None)
+
+        placement_cache.reset()
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
 
@@ -89,14 +214,10 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             else:
                 perform_access_check = True
 
-            for i, location in enumerate(locations):
-                if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
-                    # popping by index is faster than removing by content,
-                    spot_to_fill = locations.pop(i)
-                    # skipping a scan for the element
-                    break
-
+            spot_to_fill = placement_cache.find(maximum_exploration_state, item_to_place, perform_access_check,
+                                                item_to_place.player if single_player_placement else None)
+            if spot_to_fill is not None:
+                placement_cache.remove(spot_to_fill)
             else:
                 # we filled all reachable spots.
                 if swap:
@@ -112,10 +233,15 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                         if swap_count > 1:
                             continue
 
+                        if (single_player_placement and location.player != item_to_place.player) \
+                                or placement_cache.never_fills(location, item_to_place):
+                            # skip building a state for a swap that can not work out
+                            continue
+
                         location.item = None
                         placed_item.location = None
                         swap_state = sweep_from_pool(base_state, [placed_item, *item_pool] if unsafe else item_pool,
-                                                     multiworld.get_filled_locations(item.player)
+                                                     multiworld.get_filled_locations(item_to_place.player)
                                                      if single_player_placement else None)
                         # unsafe means swap_state assumes we can somehow collect placed_item before item_to_place
                         # by continuing to swap, which is not guaranteed. This is unsafe because there is no mechanic
@@ -143,6 +269,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                                 reachable_items[placed_item.player].appendleft(
                                     placed_item)
                                 item_pool.append(placed_item)
+                                pool_state.collect(placed_item, True)
 
                                 # cleanup at the end to hopefully get better errors
                                 cleanup_required = True
@@ -173,9 +300,9 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
         _log_fill_progress(name, placed, total)
 
     if cleanup_required:
-        # validate all placements and remove invalid ones
+        # validate all placements and remove invalid ones, single player placement only placed items of one player
         state = sweep_from_pool(
-            base_state, [], multiworld.get_filled_locations(item.player)
+            base_state, [], multiworld.get_filled_locations(placements[0].item.player)
             if single_player_placement else None)
         for placement in placements:
             if multiworld.worlds[placement.item.player].options.accessibility != "minimal" and not placement.can_reach(state):
@@ -183,6 +310,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                 unplaced_items.append(placement.item)
                 placement.item = None
                 locations.append(placement)
+                multiworld.invalidate_sphere_index()
 
     if allow_excluded:
         # check if partial fill is the result of excluded locations, in which case retry
@@ -327,6 +455,7 @@ def accessibility_corrections(multiworld: MultiWorld, state: CollectionState, lo
             if location in state.events:
                 state.events.remove(location)
             locations.append(location)
+            multiworld.invalidate_sphere_index()
     if pool and locations:
         locations.sort(key=lambda loc: loc.progress_type != LocationProgressType.PRIORITY)
         fill_restrictive(multiworld, state, locations, pool, name="Accessibility Corrections")
@@ -807,6 +936,7 @@ def swap_location_item(location_1: Location, location_2: Location, check_locked:
     location_2.item, location_1.item = location_1.item, location_2.item
     location_1.item.location = location_1
     location_2.item.location = location_2
+    location_1.parent_region.multiworld.invalidate_sphere_index()
 
 
 def distribute_planned(multiworld: MultiWorld) -> None:
@@ -13,6 +13,7 @@ import worlds
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region
 from Fill import balance_multiworld_progression, distribute_items_restrictive, distribute_planned, flood_items
 from Options import StartInventoryPool
+from Profiler import GenerationProfiler
 from Utils import __version__, output_path, version_tuple, get_settings
 from settings import get_settings
 from worlds import AutoWorld
@@ -32,6 +33,8 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     start = time.perf_counter()
     # initialize the multiworld
     multiworld = MultiWorld(args.multi)
+    if args.profile:
+        multiworld.profiler = GenerationProfiler(multiworld)
 
     logger = logging.getLogger()
     multiworld.set_seed(seed, args.race, str(args.outputname) if args.outputname else None)
@@ -259,6 +262,10 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     if any(multiworld.item_links.values()):
         multiworld._all_state = None
 
+    if multiworld.profiler:
+        # from here on most time is spent evaluating access rules, count them
+        multiworld.profiler.instrument_rules()
+
     logger.info("Running Item Plando.")
 
     distribute_planned(multiworld)
@@ -285,6 +292,8 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     multiworld.random.passthrough = False
 
     if args.skip_output:
+        if multiworld.profiler:
+            write_profile(multiworld)
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
         return multiworld
 
@@ -295,6 +304,10 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
+        # sweep the multiworld before going multithreaded, the accessibility check and the spoiler share the sphere
+        # index, multidata and worlds' output share the spheres
+        multiworld.get_sphere_index()
+        multiworld.get_spheres()
         with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
@@ -435,5 +448,13 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
             for file in os.scandir(temp_dir):
                 zf.write(file.path, arcname=file.name)
 
+    if multiworld.profiler:
+        write_profile(multiworld)
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
+
+
+def write_profile(multiworld: MultiWorld) -> None:
+    profile_path = output_path(f"AP_{multiworld.seed_name}_profile.json")
+    logging.info(f"Writing generation profile to {profile_path}")
+    multiworld.profiler.write(profile_path)
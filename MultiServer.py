@@ -13,8 +13,10 @@ import itertools
 import logging
 import math
 import operator
+import os
 import pickle
 import random
+import struct
 import threading
 import time
 import typing
@@ -29,6 +31,8 @@ if typing.TYPE_CHECKING:
     import ssl
 
 import websockets
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import Frame, Opcode
 import colorama
 try:
     # ponyorm is a requirement for webhost, not default server, so may not be importable
@@ -40,7 +44,7 @@ import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
 from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore
+    SlotType, LocationStore, encode_packed_items
 
 min_client_version = Version(0, 1, 6)
 colorama.init()
@@ -132,6 +136,11 @@ class Client(Endpoint):
         self.remote_items = bool(value & 0b010)
         self.remote_start_inventory = bool(value & 0b100)
 
+    @property
+    def packed_items(self) -> bool:
+        """client asked for ReceivedItems and LocationInfo as binary messages, see encode_packed_items"""
+        return "PackedItems" in self.tags
+
     @property
     def name(self) -> str:
         ctx = self.ctx()
@@ -141,6 +150,193 @@ class Client(Endpoint):
 
 
 team_slot = typing.Tuple[int, int]
+JournalRecord = typing.Tuple[str, typing.Any, typing.Any]
+"""section of the savegame, key within the section or None for all of it, value"""
+
+
+class SlotLocations(typing.NamedTuple):
+    """Cached view of a slot's locations, see Context.get_slot_locations. Shared, so do not modify."""
+    missing: typing.List[int]
+    """sorted ids of locations not checked yet"""
+    checked: typing.List[int]
+    """sorted ids of checked locations"""
+    remaining: typing.List[int]
+    """sorted ids of the items at the missing locations"""
+
+
+class SaveJournal:
+    """
+    Append-only journal of the changes to a savegame since its last full snapshot, so an autosave costs about as much
+    as the activity since the previous one, instead of pickling and compressing the whole room every time.
+
+    Each frame is the length of its payload followed by the zlib compressed pickle of it. The first frame holds the
+    generation of the snapshot the journal belongs to, every following one a list of records holding absolute values,
+    so a partially written last frame can be dropped and replaying a record twice is harmless.
+    """
+    frame_header = struct.Struct("<I")
+    appended_sections: typing.Tuple[str, ...] = ("received_items",)
+    """sections of the savegame holding lists that only get appended to, journaled as their new tail"""
+    grown_sections: typing.Tuple[str, ...] = ("location_checks", "hints")
+    """sections of the savegame holding collections that only grow, journaled whole per key when their size changes"""
+    snapshot_sections: typing.Tuple[str, ...] = ("version", "connect_names", "journal_generation")
+    """sections of the savegame only written by snapshots, every other one is journaled whole when it changes"""
+    compaction_size: int = 1024 * 1024
+    """a new snapshot is written once the journal is larger than this and larger than the last snapshot"""
+
+    file_path: str
+    generation: int
+    """random id of the snapshot this journal continues, 0 if a new snapshot is required"""
+    size: int
+    snapshot_size: int
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.generation = 0
+        self.size = 0
+        self.snapshot_size = 0
+        self._lengths: typing.Dict[str, typing.Dict[typing.Any, int]] = {}
+        self._pickled: typing.Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return not self.generation or self.size > max(self.compaction_size, self.snapshot_size)
+
+    def invalidate(self) -> None:
+        """Requires the next save to be a snapshot, for example after a failed write."""
+        self.generation = 0
+
+    def read(self, savedata: typing.Dict[str, typing.Any], snapshot_size: int) -> int:
+        """Replays the journal onto savedata loaded from the snapshot, returns the number of records replayed."""
+        self.generation = savedata.get("journal_generation", 0)
+        self.snapshot_size = snapshot_size
+        self.size = 0
+        replayed = 0
+        if self.generation:
+            try:
+                with open(self.file_path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = b""
+            frames, size = self._decode_frames(data)
+            if frames and frames[0] == self.generation:
+                for records in frames[1:]:
+                    self.apply(savedata, records)
+                    replayed += len(records)
+                self.size = size
+                if size < len(data):
+                    # drop the remains of an interrupted write, so the next frame can be read back again
+                    with open(self.file_path, "r+b") as f:
+                        f.truncate(size)
+        self.mark_saved(savedata)
+        return replayed
+
+    def save(self, snapshot_path: str, savedata: typing.Dict[str, typing.Any],
+             stored_data_changed: typing.AbstractSet[str]) -> None:
+        """Appends the changes in savedata since the last save, or writes a new snapshot once due."""
+        with self._lock:
+            if self.needs_snapshot:
+                self.write_snapshot(snapshot_path, savedata)
+            else:
+                records = self.get_records(savedata, stored_data_changed)
+                if records:
+                    self.append(records)
+
+    def write_snapshot(self, snapshot_path: str, savedata: typing.Dict[str, typing.Any]) -> None:
+        generation = int.from_bytes(os.urandom(8), "little") or 1
+        savedata["journal_generation"] = generation
+        encoded_save = zlib.compress(pickle.dumps(savedata))
+        with open(snapshot_path + ".tmp", "wb") as f:
+            f.write(encoded_save)
+        os.replace(snapshot_path + ".tmp", snapshot_path)
+        self.generation = generation
+        self.snapshot_size = len(encoded_save)
+        self.mark_saved(savedata)
+        self._write(self._encode_frame(generation), "wb")
+
+    def append(self, records: typing.List[JournalRecord]) -> None:
+        if not self.size:
+            self._write(self._encode_frame(self.generation), "wb")
+        self._write(self._encode_frame(records), "ab")
+
+    def _write(self, frame: bytes, mode: str) -> None:
+        with open(self.file_path, mode) as f:
+            f.write(frame)
+        self.size = len(frame) if mode == "wb" else self.size + len(frame)
+
+    def mark_saved(self, savedata: typing.Dict[str, typing.Any]) -> None:
+        """Sets savedata as the state that following records are relative to."""
+        for section in self.appended_sections + self.grown_sections:
+            self._lengths[section] = {key: len(values) for key, values in savedata.get(section, {}).items()}
+        self._pickled = {section: pickle.dumps(value) for section, value in savedata.items()
+                         if section not in self._journaled_per_key}
+
+    def get_records(self, savedata: typing.Dict[str, typing.Any],
+                    stored_data_changed: typing.AbstractSet[str]) -> typing.List[JournalRecord]:
+        """Returns records of what changed in savedata since the last save and updates what counts as saved."""
+        records: typing.List[JournalRecord] = []
+        for section in self.appended_sections:
+            lengths = self._lengths[section]
+            for key, values in savedata[section].items():
+                length = lengths.get(key, 0)
+                if len(values) != length:
+                    start = length if len(values) > length else 0
+                    records.append((section, key, (start, values[start:])))
+                    lengths[key] = len(values)
+        for section in self.grown_sections:
+            lengths = self._lengths[section]
+            for key, values in savedata[section].items():
+                if len(values) != lengths.get(key, 0):
+                    records.append((section, key, values))
+                    lengths[key] = len(values)
+        stored_data = savedata["stored_data"]
+        for key in stored_data_changed:
+            if key in stored_data:
+                records.append(("stored_data", key, stored_data[key]))
+        for section, value in savedata.items():
+            if section not in self._journaled_per_key:
+                pickled = pickle.dumps(value)
+                if pickled != self._pickled.get(section):
+                    records.append((section, None, value))
+                    self._pickled[section] = pickled
+        return records
+
+    @classmethod
+    def apply(cls, savedata: typing.Dict[str, typing.Any], records: typing.List[JournalRecord]) -> None:
+        for section, key, value in records:
+            if section in cls.appended_sections:
+                start, tail = value
+                savedata[section].setdefault(key, [])[start:] = tail
+            elif key is None:
+                savedata[section] = value
+            else:
+                savedata.setdefault(section, {})[key] = value
+
+    @property
+    def _journaled_per_key(self) -> typing.Tuple[str, ...]:
+        return self.appended_sections + self.grown_sections + self.snapshot_sections + ("stored_data",)
+
+    @classmethod
+    def _encode_frame(cls, data: typing.Any) -> bytes:
+        payload = zlib.compress(pickle.dumps(data))
+        return cls.frame_header.pack(len(payload)) + payload
+
+    @classmethod
+    def _decode_frames(cls, data: bytes) -> typing.Tuple[typing.List[typing.Any], int]:
+        """Returns the frames in data, up to the first incomplete one, and the size they take up."""
+        frames: typing.List[typing.Any] = []
+        offset = 0
+        while offset + cls.frame_header.size <= len(data):
+            length, = cls.frame_header.unpack_from(data, offset)
+            end = offset + cls.frame_header.size + length
+            if end > len(data):
+                break
+            try:
+                frames.append(restricted_loads(zlib.decompress(data[offset + cls.frame_header.size:end])))
+            except Exception:
+                break
+            offset = end
+        return frames, offset
 
 
 class Context:
@@ -209,13 +405,24 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.new_item_slots: typing.Set[team_slot] = set()  # slots that received items not sent to their clients yet
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
+        self.slot_locations: typing.Dict[team_slot, SlotLocations] = {}  # dropped when location_checks change
+        self.location_items: typing.Dict[int, typing.Dict[int, NetworkItem]] = {}  # slot -> location id -> item
         self.hint_cost = hint_cost
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[NetUtils.Hint]] = collections.defaultdict(set)
+        # hint sets loaded from a save, which may hold hints for locations checked since they were last rechecked
+        self.dirty_hints: typing.Set[team_slot] = set()
+        # (team, finding slot, location id) -> hint sets holding an unfound hint for that location, with the hint
+        self.hint_index: typing.DefaultDict[typing.Tuple[int, int, int], typing.List[
+            typing.Tuple[team_slot, NetUtils.Hint]]] = collections.defaultdict(list)
+        # (receiving slot, item id) -> finding slot, location id and item flags of each placement, built on first use
+        self.item_locations: typing.Optional[typing.DefaultDict[
+            typing.Tuple[int, int], typing.List[typing.Tuple[int, int, int]]]] = None
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -234,6 +441,8 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        self.save_journal: typing.Optional[SaveJournal] = None
+        self.stored_data_changed: typing.Set[str] = set()  # keys of stored_data written since the last save
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
@@ -245,6 +454,8 @@ class Context:
         self.stored_data_notification_clients = collections.defaultdict(weakref.WeakSet)
         self.read_data = {}
         self.spheres = []
+        self._sphere_index: typing.Dict[int, typing.Dict[int, int]] = {}  # player -> location id -> sphere
+        self._indexed_spheres: typing.Optional[typing.List[typing.Dict[int, typing.Set[int]]]] = None
 
         # init empty to satisfy linter, I suppose
         self.gamespackage = {}
@@ -254,6 +465,7 @@ class Context:
         self.all_item_and_group_names = {}
         self.all_location_and_group_names = {}
         self.non_hintable_names = collections.defaultdict(frozenset)
+        self.data_package_msgs: typing.Dict[typing.FrozenSet[str], str] = {}  # encoded once per requested games
 
         self._load_game_data()
 
@@ -270,9 +482,9 @@ class Context:
             self.non_hintable_names[world_name] = world.hint_blacklist
 
         for game_package in self.gamespackage.values():
-            # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+            # remove groups from data sent to clients, the package is shared by all Contexts of this process
+            game_package.pop("item_name_groups", None)
+            game_package.pop("location_name_groups", None)
 
     def _init_game_data(self):
         for game_name, game_package in self.gamespackage.items():
@@ -316,7 +528,7 @@ class Context:
                 self.logger.info(f"Outgoing message: {msg}")
             return True
 
-    async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
+    async def send_encoded_msgs(self, endpoint: Endpoint, msg: typing.Union[str, bytes]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
         try:
@@ -345,6 +557,15 @@ class Context:
                 self.logger.info(f"Outgoing broadcast: {msg}")
             return True
 
+    def dump_items(self, client: Client, cmd: str, items: typing.Sequence[NetworkItem],
+                   index: int = 0) -> typing.Union[str, bytes]:
+        """Encodes a ReceivedItems or LocationInfo packet, as a binary message if the client asked for it."""
+        if client.packed_items:
+            return encode_packed_items(cmd, items, index)
+        if cmd == "ReceivedItems":
+            return self.dumper([{"cmd": cmd, "index": index, "items": items}])
+        return self.dumper([{"cmd": cmd, "locations": items}])
+
     def broadcast_all(self, msgs: typing.List[dict]):
         msgs = self.dumper(msgs)
         endpoints = (endpoint for endpoint in self.endpoints if endpoint.auth)
@@ -445,6 +666,8 @@ class Context:
         self.random.seed(self.seed_name)
         self.connect_names = decoded_obj['connect_names']
         self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
+        self.location_items.clear()
+        self.item_locations = None
         self.slot_data = decoded_obj['slot_data']
         for slot, data in self.slot_data.items():
             self.read_data[f"slot_data_{slot}"] = lambda data=data: data
@@ -456,7 +679,7 @@ class Context:
             self.start_inventory[slot] = [NetworkItem(item_code, -2, 0) for item_code in item_codes]
 
         for slot, hints in decoded_obj["precollected_hints"].items():
-            self.hints[0, slot].update(hints)
+            self.add_hints(0, slot, hints)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -480,6 +703,7 @@ class Context:
                 del data["location_name_groups"]
             del data["item_name_groups"]  # remove from data package, but keep in self.item_name_groups
         self._init_game_data()
+        self.data_package_msgs.clear()
         for game_name, data in self.item_name_groups.items():
             self.read_data[f"item_name_groups_{game_name}"] = lambda lgame=game_name: self.item_name_groups[lgame]
         for game_name, data in self.location_name_groups.items():
@@ -487,6 +711,7 @@ class Context:
 
         # sorted access spheres
         self.spheres = decoded_obj.get("spheres", [])
+        self._index_spheres()
 
     # saving
 
@@ -503,10 +728,16 @@ class Context:
 
     def _save(self, exit_save: bool = False) -> bool:
         try:
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            if self.save_journal:
+                stored_data_changed, self.stored_data_changed = self.stored_data_changed, set()
+                self.save_journal.save(self.save_filename, self.get_save(), stored_data_changed)
+            else:
+                encoded_save = pickle.dumps(self.get_save())
+                with open(self.save_filename, "wb") as f:
+                    f.write(zlib.compress(encoded_save))
         except Exception as e:
+            if self.save_journal:
+                self.save_journal.invalidate()
             self.logger.exception(e)
             return False
         else:
@@ -516,20 +747,29 @@ class Context:
         self.saving = enabled
         if self.saving:
             if not self.save_filename:
-                import os
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
+            self.save_journal = SaveJournal(self.save_filename + '.journal')
             try:
-                with open(self.save_filename, 'rb') as f:
-                    save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                self._load_save()
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
                 self.logger.exception(e)
             self._start_async_saving()
 
+    def _load_save(self):
+        with open(self.save_filename, 'rb') as f:
+            save_data = restricted_loads(zlib.decompress(f.read()))
+        if self.save_journal:
+            replayed = self.save_journal.read(save_data, os.path.getsize(self.save_filename))
+            if replayed:
+                self.logger.info(f"Replayed {replayed} journaled changes onto save file.")
+        self.set_save(save_data)
+        # whether a hint was found is not journaled, it is derived from location_checks
+        self.recheck_hints()
+
     def _start_async_saving(self, atexit_save: bool = True):
         if not self.auto_saver_thread:
             def save_regularly():
@@ -594,6 +834,10 @@ class Context:
         self.received_items = savedata["received_items"]
         self.hints_used.update(savedata["hints_used"])
         self.hints.update(savedata["hints"])
+        self.dirty_hints.update(self.hints)
+        self.hint_index.clear()
+        for (team, slot), hints in self.hints.items():
+            self._index_hints(team, slot, hints)
 
         self.name_aliases.update(savedata["name_aliases"])
         self.client_game_state.update(savedata["client_game_state"])
@@ -604,6 +848,7 @@ class Context:
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
              in savedata["client_activity_timers"]})
         self.location_checks.update(savedata["location_checks"])
+        self.slot_locations.clear()
         self.random.setstate(savedata["random_state"])
 
         if "game_options" in savedata:
@@ -635,12 +880,55 @@ class Context:
         return 0
 
     def recheck_hints(self, team: typing.Optional[int] = None, slot: typing.Optional[int] = None):
-        for hint_team, hint_slot in self.hints:
-            if (team is None or team == hint_team) and (slot is None or slot == hint_slot):
-                self.hints[hint_team, hint_slot] = {
-                    hint.re_check(self, hint_team) for hint in
-                    self.hints[hint_team, hint_slot]
-                }
+        """Updates whether hints were found, for team and slot if given, else for all slots loaded from a save."""
+        keys: typing.Iterable[team_slot]
+        if team is not None and slot is not None:
+            keys = ((team, slot),)
+        elif team is None and slot is None:
+            keys = tuple(self.dirty_hints)
+        else:
+            keys = [(hint_team, hint_slot) for hint_team, hint_slot in self.hints
+                    if (team is None or team == hint_team) and (slot is None or slot == hint_slot)]
+        for hint_team, hint_slot in keys:
+            self.hints[hint_team, hint_slot] = {
+                hint.re_check(self, hint_team) for hint in
+                self.hints[hint_team, hint_slot]
+            }
+        self.dirty_hints.difference_update(keys)
+
+    def add_hints(self, team: int, slot: int, hints: typing.Iterable[NetUtils.Hint]):
+        """Adds hints to the hint set of team and slot, indexing the unfound ones for update_found_hints."""
+        hint_set = self.hints[team, slot]
+        new_hints = [hint for hint in hints if hint not in hint_set]
+        hint_set.update(new_hints)
+        self._index_hints(team, slot, new_hints)
+
+    def _index_hints(self, team: int, slot: int, hints: typing.Iterable[NetUtils.Hint]):
+        for hint in hints:
+            if not hint.found:
+                self.hint_index[team, hint.finding_player, hint.location].append(((team, slot), hint))
+
+    def update_found_hints(self, team: int, slot: int, locations: typing.Iterable[int]) -> typing.Set[team_slot]:
+        """Marks the hints for newly checked locations of slot as found, returning the hint sets that changed."""
+        changed: typing.Set[team_slot] = set()
+        for location in locations:
+            for key, hint in self.hint_index.pop((team, slot, location), ()):
+                hint_set = self.hints[key]
+                if hint in hint_set:
+                    hint_set.remove(hint)
+                    hint_set.add(hint.re_check(self, team))
+                    changed.add(key)
+        return changed
+
+    def get_item_locations(self, receiving_slot: int, item_id: int) -> typing.List[typing.Tuple[int, int, int]]:
+        """Returns finding slot, location id and item flags of each placement of item_id for receiving_slot."""
+        if self.item_locations is None:
+            self.item_locations = collections.defaultdict(list)
+            for finding_player, check_data in self.locations.items():
+                for location_id, (placed_item_id, receiving_player, item_flags) in check_data.items():
+                    self.item_locations[receiving_player, placed_item_id].append(
+                        (finding_player, location_id, item_flags))
+        return self.item_locations.get((receiving_slot, item_id), [])
 
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
@@ -649,13 +937,49 @@ class Context:
     def get_sphere(self, player: int, location_id: int) -> int:
         """Get sphere of a location, -1 if spheres are not available."""
         if self.spheres:
-            for i, sphere in enumerate(self.spheres):
-                if location_id in sphere.get(player, set()):
-                    return i
-            raise KeyError(f"No Sphere found for location ID {location_id} belonging to player {player}. "
-                           f"Location or player may not exist.")
+            if self._indexed_spheres is not self.spheres:
+                self._index_spheres()
+            sphere = self._sphere_index.get(player, {}).get(location_id)
+            if sphere is None:
+                raise KeyError(f"No Sphere found for location ID {location_id} belonging to player {player}. "
+                               f"Location or player may not exist.")
+            return sphere
         return -1
 
+    def _index_spheres(self):
+        self._sphere_index = {}
+        for i, sphere in reversed(tuple(enumerate(self.spheres))):  # reversed, so the earliest sphere wins
+            for player, locations in sphere.items():
+                self._sphere_index.setdefault(player, {}).update(dict.fromkeys(locations, i))
+        self._indexed_spheres = self.spheres
+
+    def get_data_package_msg(self, games: typing.FrozenSet[str]) -> str:
+        """Returns the encoded DataPackage message for games, which is static, so it is only encoded once per room."""
+        msg = self.data_package_msgs.get(games)
+        if msg is None:
+            msg = self.data_package_msgs[games] = self.dumper([{
+                "cmd": "DataPackage", "data": {"games": {name: self.gamespackage[name] for name in games}}}])
+        return msg
+
+    def get_slot_locations(self, team: int, slot: int) -> SlotLocations:
+        """Returns the missing and checked locations of a slot, computed once per change of its location_checks."""
+        slot_locations = self.slot_locations.get((team, slot))
+        if slot_locations is None:
+            slot_locations = self.slot_locations[team, slot] = SlotLocations(
+                sorted(self.locations.get_missing(self.location_checks, team, slot)),
+                sorted(self.locations.get_checked(self.location_checks, team, slot)),
+                self.locations.get_remaining(self.location_checks, team, slot))
+        return slot_locations
+
+    def get_location_items(self, slot: int) -> typing.Dict[int, NetworkItem]:
+        """Returns the NetworkItem, as sent in LocationInfo, for each location of slot, built on first use."""
+        location_items = self.location_items.get(slot)
+        if location_items is None:
+            location_items = self.location_items[slot] = {
+                location: NetworkItem(item, location, player, flags)
+                for location, (item, player, flags) in self.locations[slot].items()}
+        return location_items
+
     def get_players_package(self):
         return [NetworkPlayer(t, p, self.get_aliased_name(t, p), n) for (t, p), n in self.player_names.items()]
 
@@ -709,10 +1033,10 @@ class Context:
                 # since hints are bidirectional, finding player and receiving player,
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
-                    self.hints[team, hint.finding_player].add(hint)
+                    self.add_hints(team, hint.finding_player, (hint,))
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
-                        self.hints[team, player].add(hint)
+                        self.add_hints(team, player, (hint,))
                         new_hint_events.add(player)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
@@ -724,8 +1048,9 @@ class Context:
                 if not clients:
                     continue
                 client_hints = [datum[1] for datum in sorted(hint_data, key=lambda x: x[0].finding_player != slot)]
+                msg = self.dumper(client_hints)
                 for client in clients:
-                    async_start(self.send_msgs(client, client_hints))
+                    async_start(self.send_encoded_msgs(client, msg))
 
     # "events"
 
@@ -768,6 +1093,52 @@ def update_aliases(ctx: Context, team: int):
             async_start(ctx.send_encoded_msgs(client, cmd))
 
 
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate that sends messages smaller than min_size uncompressed, which the extension allows."""
+    min_size: int
+
+    def __init__(self, *args: typing.Any, min_size: int = 0, **kwargs: typing.Any):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+
+    def encode(self, frame: Frame) -> Frame:
+        if frame.opcode in (Opcode.TEXT, Opcode.BINARY) and frame.fin and len(frame.data) < self.min_size:
+            return frame
+        return super().encode(frame)
+
+
+class ThresholdPerMessageDeflateFactory(ServerPerMessageDeflateFactory):
+    min_size: int
+
+    def __init__(self, *args: typing.Any, min_size: int = 0, **kwargs: typing.Any):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+
+    def process_request_params(self, params, accepted_extensions):
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+        return response_params, ThresholdPerMessageDeflate(
+            extension.remote_no_context_takeover, extension.local_no_context_takeover,
+            extension.remote_max_window_bits, extension.local_max_window_bits, extension.compress_settings,
+            min_size=self.min_size)
+
+
+def get_compression_options(compression: str = "deflate", threshold: int = 0,
+                            level: int = zlib.Z_DEFAULT_COMPRESSION) -> typing.Dict[str, typing.Any]:
+    """
+    Keyword arguments for websockets.serve implementing a compression policy.
+    "deflate" negotiates permessage-deflate with clients offering it, compressing messages of at least threshold bytes
+    at level, "off" sends all messages uncompressed.
+    """
+    if compression == "off":
+        return {"compression": None}
+    if compression != "deflate":
+        raise ValueError(f"Unknown compression {compression}, expected deflate or off.")
+    # window bits and memLevel like the websockets defaults, keeping memory per connection low
+    return {"compression": None, "extensions": [ThresholdPerMessageDeflateFactory(
+        server_max_window_bits=12, client_max_window_bits=12, compress_settings={"memLevel": 5, "level": level},
+        min_size=threshold)]}
+
+
 async def server(websocket, path: str = "/", ctx: Context = None):
     client = Client(websocket, ctx)
     ctx.endpoints.append(client)
@@ -940,20 +1311,26 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
 
 
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
+    """Sends the items received since the last call to the clients of the slots that received them."""
+    new_item_slots, ctx.new_item_slots = ctx.new_item_slots, set()
+    for team, slot in new_item_slots:
+        # clients of a slot with the same items handling and progress get the same message, encode it once
+        encoded_msgs: typing.Dict[typing.Tuple[int, bool, bool, bool], typing.Union[str, bytes]] = {}
+        for client in ctx.clients.get(team, {}).get(slot, ()):
+            if client.no_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                key = (client.send_index, client.remote_items, client.remote_start_inventory, client.packed_items)
+                msg = encoded_msgs.get(key)
+                if msg is None:
                     first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+                    msg = encoded_msgs[key] = ctx.dump_items(
+                        client, "ReceivedItems", start_inventory[client.send_index:] + items[first_new_item:],
+                        client.send_index)
+                async_start(ctx.send_encoded_msgs(client, msg))
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
@@ -992,7 +1369,7 @@ def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
 
 
 def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[int]:
-    return ctx.locations.get_remaining(ctx.location_checks, team, slot)
+    return ctx.get_slot_locations(team, slot).remaining
 
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
@@ -1001,6 +1378,7 @@ def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
             get_received_items(ctx, team, target, True).append(item)
+        ctx.new_item_slots.add((team, target))
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1010,6 +1388,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
     if new_locations:
         if count_activity:
             ctx.client_activity_timers[team, slot] = datetime.datetime.now(datetime.timezone.utc)
+        info_texts: typing.List[dict] = []
         for location in new_locations:
             item_id, target_player, flags = ctx.locations[slot][location]
             new_item = NetworkItem(item_id, location, slot, flags)
@@ -1018,20 +1397,20 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             ctx.logger.info('(Team #%d) %s sent %s to %s (%s)' % (
                 team + 1, ctx.player_names[(team, slot)], ctx.item_names[ctx.slot_info[target_player].game][item_id],
                 ctx.player_names[(team, target_player)], ctx.location_names[ctx.slot_info[slot].game][location]))
-            info_text = json_format_send_event(new_item, target_player)
-            ctx.broadcast_team(team, [info_text])
+            info_texts.append(json_format_send_event(new_item, target_player))
+        # encode and send all item send events of this batch at once
+        ctx.broadcast_team(team, info_texts)
 
         ctx.location_checks[team, slot] |= new_locations
+        ctx.slot_locations.pop((team, slot), None)
         send_new_items(ctx)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
             "hint_points": get_slot_points(ctx, team, slot),
             "checked_locations": new_locations,  # send back new checks only
         }])
-        old_hints = ctx.hints[team, slot].copy()
-        ctx.recheck_hints(team, slot)
-        if old_hints != ctx.hints[team, slot]:
-            ctx.on_changed_hints(team, slot)
+        for hint_team, hint_slot in ctx.update_found_hints(team, slot, new_locations):
+            ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
 
 
@@ -1043,12 +1422,12 @@ def collect_hints(ctx: Context, team: int, slot: int, item: typing.Union[int, st
             slots.add(group_id)
 
     seeked_item_id = item if isinstance(item, int) else ctx.item_names_for_game(ctx.games[slot])[item]
-    for finding_player, location_id, item_id, receiving_player, item_flags \
-            in ctx.locations.find_item(slots, seeked_item_id):
-        found = location_id in ctx.location_checks[team, finding_player]
-        entrance = ctx.er_hint_data.get(finding_player, {}).get(location_id, "")
-        hints.append(NetUtils.Hint(receiving_player, finding_player, location_id, item_id, found, entrance,
-                                   item_flags))
+    for receiving_player in slots:
+        for finding_player, location_id, item_flags in ctx.get_item_locations(receiving_player, seeked_item_id):
+            found = location_id in ctx.location_checks[team, finding_player]
+            entrance = ctx.er_hint_data.get(finding_player, {}).get(location_id, "")
+            hints.append(NetUtils.Hint(receiving_player, finding_player, location_id, seeked_item_id, found, entrance,
+                                       item_flags))
 
     return hints
 
@@ -1458,6 +1837,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
                 get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
                 get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.new_item_slots.add((self.client.team, self.client.slot))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1617,11 +1997,11 @@ class ClientMessageProcessor(CommonCommandProcessor):
 
 
 def get_checked_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
-    return ctx.locations.get_checked(ctx.location_checks, team, slot)
+    return ctx.get_slot_locations(team, slot).checked
 
 
 def get_missing_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
-    return ctx.locations.get_missing(ctx.location_checks, team, slot)
+    return ctx.get_slot_locations(team, slot).missing
 
 
 def get_client_points(ctx: Context, client: Client) -> int:
@@ -1707,10 +2087,14 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 "hint_points": get_slot_points(ctx, team, slot),
             }
             reply = [connected_packet]
+            packed_items: typing.Optional[bytes] = None
             start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
             if (start_inventory or items) and not client.no_items:
-                reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items})
+                if client.packed_items:
+                    packed_items = encode_packed_items("ReceivedItems", start_inventory + items)
+                else:
+                    reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items})
                 client.send_index = len(start_inventory) + len(items)
             if not client.auth:  # if this was a Re-Connect, don't print to console
                 client.auth = True
@@ -1718,27 +2102,21 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             if args.get("slot_data", True):
                 connected_packet["slot_data"] = ctx.slot_data[client.slot]
             await ctx.send_msgs(client, reply)
+            if packed_items:
+                await ctx.send_encoded_msgs(client, packed_items)
 
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            requested = set(args.get("games", []))
+            games = frozenset(name for name in ctx.gamespackage if name in requested)
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
-
+            games = frozenset(name for name in ctx.gamespackage if name not in exclusions)
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            games = frozenset(ctx.gamespackage)
+        await ctx.send_encoded_msgs(client, ctx.get_data_package_msg(games))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1754,8 +2132,8 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                     items = get_received_items(ctx, client.team, client.slot, client.remote_items)
                     if (items or start_inventory) and not client.no_items:
                         client.send_index = len(start_inventory) + len(items)
-                        await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                                      "items": start_inventory + items}])
+                        await ctx.send_encoded_msgs(client, ctx.dump_items(client, "ReceivedItems",
+                                                                           start_inventory + items))
                     else:
                         client.send_index = 0
                 except (ValueError, TypeError) as err:
@@ -1779,8 +2157,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
             if (start_inventory or items) and not client.no_items:
                 client.send_index = len(start_inventory) + len(items)
-                await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                              "items": start_inventory + items}])
+                await ctx.send_encoded_msgs(client, ctx.dump_items(client, "ReceivedItems", start_inventory + items))
 
         elif cmd == 'LocationChecks':
             if client.no_locations:
@@ -1794,6 +2171,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             locs = []
             create_as_hint: int = int(args.get("create_as_hint", 0))
             hints = []
+            location_items = ctx.get_location_items(client.slot)
             for location in args["locations"]:
                 if type(location) is not int:
                     await ctx.send_msgs(client,
@@ -1801,14 +2179,14 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                                           "original_cmd": cmd}])
                     return
 
-                target_item, target_player, flags = ctx.locations[client.slot][location]
+                network_item = location_items[location]
                 if create_as_hint:
                     hints.extend(collect_hint_location_id(ctx, client.team, client.slot, location))
-                locs.append(NetworkItem(target_item, location, target_player, flags))
+                locs.append(network_item)
             ctx.notify_hints(client.team, hints, only_new=create_as_hint == 2)
             if locs and create_as_hint:
                 ctx.save()
-            await ctx.send_msgs(client, [{'cmd': 'LocationInfo', 'locations': locs}])
+            await ctx.send_encoded_msgs(client, ctx.dump_items(client, "LocationInfo", locs))
 
         elif cmd == 'StatusUpdate':
             update_client_status(ctx, client, args["status"])
@@ -1861,6 +2239,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            ctx.stored_data_changed.add(args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", True):
                 targets.add(client)
@@ -2284,6 +2663,12 @@ def parse_args() -> argparse.Namespace:
     #0 -> recommended for tournaments to force a level playing field, only allow an exact version match
     """)
     parser.add_argument('--log_network', default=defaults["log_network"], action="store_true")
+    parser.add_argument('--compression', default=defaults["compression"], choices=["deflate", "off"],
+                        help="deflate: compress messages for clients that support it, off: never compress")
+    parser.add_argument('--compression_threshold', default=defaults["compression_threshold"], type=int,
+                        help="Send messages smaller than this many bytes uncompressed")
+    parser.add_argument('--compression_level', default=defaults["compression_level"], type=int,
+                        help="zlib level from 1, fastest, to 9, smallest, or -1 for the zlib default")
     args = parser.parse_args()
     return args
 
@@ -2362,7 +2747,9 @@ async def main(args: argparse.Namespace):
 
     ssl_context = load_server_cert(args.cert, args.cert_key) if args.cert else None
 
-    ctx.server = websockets.serve(functools.partial(server, ctx=ctx), host=ctx.host, port=ctx.port, ssl=ssl_context)
+    ctx.server = websockets.serve(functools.partial(server, ctx=ctx), host=ctx.host, port=ctx.port, ssl=ssl_context,
+                                  **get_compression_options(args.compression, args.compression_threshold,
+                                                            args.compression_level))
     ip = args.host if args.host else Utils.get_public_ipv4()
     logging.info('Hosting game at %s:%d (%s)' % (ip, ctx.port,
                                                  'No password' if not ctx.password else 'Password: %s' % ctx.password))
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import typing
 import enum
+import struct
 import warnings
 from json import JSONEncoder, JSONDecoder
 
+import orjson
 import websockets
 
 from Utils import ByValue, Version
@@ -101,8 +103,29 @@ _encode = JSONEncoder(
 ).encode
 
 
+def _orjson_default(obj: typing.Any) -> typing.Any:
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):  # orjson only asks for NamedTuples, not plain tuples
+        data = obj._asdict()
+        data["class"] = obj.__class__.__name__
+        return data
+    if isinstance(obj, (set, frozenset)):
+        return tuple(obj)
+    raise TypeError
+
+
 def encode(obj: typing.Any) -> str:
-    return _encode(_scan_for_TypedTuples(obj))
+    """
+    Encodes obj as json, like scanning it for NamedTuples and encoding it with JSONEncoder, except for floats:
+    NaN and Infinity become null instead of the NaN and Infinity JSONEncoder writes, which aren't valid JSON,
+    and some floats are written differently, like 1e-7 instead of 1e-07. These still decode to the same number,
+    but not to the same str when used as dict key.
+    """
+    try:
+        # orjson hands NamedTuples and sets to _orjson_default by itself, so no python-side scan of obj is needed
+        return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        # for example integers beyond 64 bit, which json supports
+        return _encode(_scan_for_TypedTuples(obj))
 
 
 def get_any_version(data: dict) -> Version:
@@ -138,6 +161,29 @@ def _object_hook(o: typing.Any) -> typing.Any:
 
 decode = JSONDecoder(object_hook=_object_hook).decode
 
+packed_items_commands = ("ReceivedItems", "LocationInfo")
+"""commands sent as binary messages to clients with the PackedItems tag, identified by their index in here"""
+_packed_items_header = struct.Struct("<BII")  # command, index, item count
+_packed_item_format = "qqii"  # item, location, player, flags
+
+
+def encode_packed_items(cmd: str, items: typing.Sequence[NetworkItem], index: int = 0) -> bytes:
+    """Encodes a ReceivedItems or LocationInfo packet as a binary message, see PackedItems in network protocol.md"""
+    header = _packed_items_header.pack(packed_items_commands.index(cmd), index, len(items))
+    return header + struct.pack("<" + _packed_item_format * len(items),
+                                *(value for network_item in items for value in network_item))
+
+
+def decode_packed_items(data: bytes) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Decodes a binary message created by encode_packed_items into the packet it stands for."""
+    command, index, count = _packed_items_header.unpack_from(data)
+    values = struct.unpack_from("<" + _packed_item_format * count, data, _packed_items_header.size)
+    items = [NetworkItem(*values[i:i + 4]) for i in range(0, len(values), 4)]
+    cmd = packed_items_commands[command]
+    if cmd == "ReceivedItems":
+        return [{"cmd": cmd, "index": index, "items": items}]
+    return [{"cmd": cmd, "locations": items}]
+
 
 class Endpoint:
     socket: websockets.WebSocketServerProtocol
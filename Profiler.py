@@ -0,0 +1,158 @@
+"""
+Optional profiling of a generation, enabled with Generate.py --profile.
+
+Records wall time per AutoWorld stage and player, calls of and time spent in each Location's and Entrance's
+access rule, time spent searching for reachable regions per player and time spent sweeping for events.
+The result is written as json next to the output, to find out which world of a large multiworld takes the time.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+import typing
+from collections import defaultdict
+
+from BaseClasses import Entrance, Location
+
+if typing.TYPE_CHECKING:
+    from BaseClasses import CollectionState, MultiWorld
+
+__all__ = ["GenerationProfiler", "ProfiledRule"]
+
+
+class ProfiledRule:
+    """Wraps an access rule, counting its calls and the time spent in them, including nested rules it evaluates."""
+    __slots__ = ("rule", "calls", "time")
+
+    rule: typing.Callable[["CollectionState"], bool]
+    calls: int
+    time: float
+
+    def __init__(self, rule: typing.Callable[["CollectionState"], bool]):
+        self.rule = rule
+        self.calls = 0
+        self.time = 0.0
+
+    def __call__(self, state: "CollectionState") -> bool:
+        start = time.perf_counter()
+        try:
+            return self.rule(state)
+        finally:
+            self.time += time.perf_counter() - start
+            self.calls += 1
+
+
+class GenerationProfiler:
+    """
+    Collects the timings of one generation, attach to MultiWorld.profiler to enable it.
+
+    Stage timings are recorded by AutoWorld.call_single and AutoWorld.call_stage, reachability and sweep timings by
+    CollectionState while a profiler is attached. Access rules are only counted after instrument_rules was called.
+    Counts of rules evaluated from multiple threads at once, like during output, are approximate.
+    """
+    multiworld: "MultiWorld"
+    start: float
+    player_stages: typing.DefaultDict[int, typing.DefaultDict[str, float]]
+    world_stages: typing.DefaultDict[str, typing.DefaultDict[str, float]]
+    reachability_calls: typing.DefaultDict[int, int]
+    reachability_time: typing.DefaultDict[int, float]
+    sweep_calls: int
+    sweep_rounds: int
+    sweep_time: float
+    rules: typing.List[typing.Tuple[typing.Union[Location, Entrance], ProfiledRule]]
+
+    def __init__(self, multiworld: "MultiWorld"):
+        self.multiworld = multiworld
+        self.start = time.perf_counter()
+        self.player_stages = defaultdict(lambda: defaultdict(float))
+        self.world_stages = defaultdict(lambda: defaultdict(float))
+        self.reachability_calls = defaultdict(int)
+        self.reachability_time = defaultdict(float)
+        self.sweep_calls = 0
+        self.sweep_rounds = 0
+        self.sweep_time = 0.0
+        self.rules = []
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: str, player: typing.Optional[int], game: typing.Optional[str], taken: float) -> None:
+        """Records a call of stage for player, or of a stage_ classmethod for game if player is None."""
+        with self._lock:
+            if player is None:
+                self.world_stages[game or "Unknown"][stage] += taken
+            else:
+                self.player_stages[player][stage] += taken
+
+    def add_reachability(self, player: int, taken: float) -> None:
+        self.reachability_calls[player] += 1
+        self.reachability_time[player] += taken
+
+    def add_sweep(self, rounds: int, taken: float) -> None:
+        self.sweep_calls += 1
+        self.sweep_rounds += rounds
+        self.sweep_time += taken
+
+    def instrument_rules(self) -> None:
+        """Wraps the access rules of all Locations and Entrances that have one, to count their calls."""
+        multiworld = self.multiworld
+        spots: typing.Iterable[typing.Union[Location, Entrance]]
+        for spots in (multiworld.get_locations(), multiworld.get_entrances()):
+            for spot in spots:
+                rule = spot.access_rule
+                if rule is spot.__class__.access_rule or isinstance(rule, ProfiledRule):
+                    continue
+                profiled = ProfiledRule(rule)
+                spot.access_rule = profiled
+                self.rules.append((spot, profiled))
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        multiworld = self.multiworld
+        players: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        for player in multiworld.player_ids:
+            stages = self.player_stages[player]
+            players[str(player)] = {
+                "name": multiworld.player_name[player],
+                "game": multiworld.game[player],
+                "stage_time": sum(stages.values()),
+                "stages": dict(stages),
+                "rule_calls": 0,
+                "rule_time": 0.0,
+                "reachability_calls": self.reachability_calls[player],
+                "reachability_time": self.reachability_time[player],
+            }
+
+        rules: typing.List[typing.Dict[str, typing.Any]] = []
+        for spot, profiled in self.rules:
+            if not profiled.calls:
+                continue
+            rules.append({
+                "player": spot.player,
+                "type": "Location" if isinstance(spot, Location) else "Entrance",
+                "name": spot.name,
+                "calls": profiled.calls,
+                "time": profiled.time,
+            })
+            if str(spot.player) in players:
+                player_data = players[str(spot.player)]
+                player_data["rule_calls"] += profiled.calls
+                player_data["rule_time"] += profiled.time
+        rules.sort(key=lambda rule_data: rule_data["time"], reverse=True)
+
+        stages: typing.DefaultDict[str, float] = defaultdict(float)
+        for player_stages in self.player_stages.values():
+            for stage, taken in player_stages.items():
+                stages[stage] += taken
+
+        return {
+            "seed": multiworld.seed_name,
+            "players": players,
+            "total_time": time.perf_counter() - self.start,
+            "stages": dict(stages),
+            "world_stages": {game: dict(world_stages) for game, world_stages in self.world_stages.items()},
+            "sweeps": {"calls": self.sweep_calls, "rounds": self.sweep_rounds, "time": self.sweep_time},
+            "rules": rules,
+        }
+
+    def write(self, file_path: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
@@ -53,6 +53,12 @@ app.config["MAX_ROLL"] = 20
 app.config["CACHE_TYPE"] = "SimpleCache"
 app.config["HOST_ADDRESS"] = ""
 app.config["ASSET_RIGHTS"] = False
+# compression of room websocket messages, "deflate" or "off", see MultiServer's --compression
+app.config["ROOM_COMPRESSION"] = "deflate"
+# room messages smaller than this many bytes are sent uncompressed
+app.config["ROOM_COMPRESSION_THRESHOLD"] = 128
+# zlib level from 1, fastest, to 9, smallest, or -1 for the zlib default
+app.config["ROOM_COMPRESSION_LEVEL"] = -1
 
 cache = Cache()
 Compress(app)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import heapq
 import json
 import logging
 import multiprocessing
+import os
 import typing
 from datetime import timedelta, datetime
 from threading import Event, Thread
@@ -14,6 +16,7 @@ from Utils import restricted_loads
 from .locker import Locker, AlreadyRunningException
 
 _stop_event = Event()
+_room_activity_event = Event()
 
 
 def stop():
@@ -24,6 +27,11 @@ def stop():
     stop_event.set()
 
 
+def notify_room_activity():
+    """Wakes up the autohost of this process to look for rooms with new activity, instead of at its next poll"""
+    _room_activity_event.set()
+
+
 def handle_generation_success(seed_id):
     logging.info(f"Generation finished for seed {seed_id}")
 
@@ -71,6 +79,82 @@ def cleanup():
         logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
 
 
+class RoomScheduler:
+    """
+    Decides which rooms are hosted and by which hoster.
+
+    Rooms are found through last_activity, which is set when a room is created, its page is visited or it saves.
+    Each poll only queries rooms with activity since the previous poll, their timeouts are kept in a heap in memory.
+    Rooms are placed on the running hoster with the fewest live rooms, then least memory, and stay there until shut
+    down.
+    A room that shuts down is only started again if it had activity within its timeout.
+    """
+    poll_interval: typing.ClassVar[float] = 1  # seconds between polls, if not woken up by notify_room_activity
+    poll_overlap: typing.ClassVar[timedelta] = timedelta(seconds=5)  # for transactions committed late
+    timeout_buffer: typing.ClassVar[timedelta] = timedelta(seconds=5)
+
+    hosters: typing.List[MultiworldInstance]
+    timeouts: typing.List[typing.Tuple[datetime, UUID]]  # heap of timeout and room, entries may be outdated
+    room_timeouts: typing.Dict[UUID, datetime]
+    room_hosters: typing.Dict[UUID, MultiworldInstance]
+    last_poll: typing.Optional[datetime]
+
+    def __init__(self, hosters: typing.List[MultiworldInstance]):
+        self.hosters = hosters
+        self.timeouts = []
+        self.room_timeouts = {}
+        self.room_hosters = {}
+        self.last_poll = None
+
+    def poll(self):
+        now = datetime.utcnow()
+        # on the first poll, all rooms that can still be within their timeout
+        since = now - timedelta(days=3) if self.last_poll is None else self.last_poll - self.poll_overlap
+        self.last_poll = now
+        with db_session:
+            rooms = select((room.id, room.last_activity, room.timeout) for room in Room
+                           if room.last_activity >= since)[:]
+            for room_id, last_activity, timeout in rooms:
+                self.update_room(room_id, last_activity + timedelta(seconds=timeout) + self.timeout_buffer, now)
+
+            while self.timeouts and self.timeouts[0][0] <= now:
+                timeout, room_id = heapq.heappop(self.timeouts)
+                if self.room_timeouts.get(room_id) == timeout:
+                    del self.room_timeouts[room_id]
+                    hoster = self.room_hosters.get(room_id)
+                    if hoster and hoster.done():  # crashed hosters don't report their rooms as shut down
+                        del self.room_hosters[room_id]
+                        hoster.room_ids.discard(room_id)
+
+            for hoster in self.hosters:
+                for room_id in hoster.get_shut_down_rooms():
+                    self.room_hosters.pop(room_id, None)
+                    if room_id not in self.room_timeouts:
+                        continue  # timed out without new activity
+                    # a room moves its last_activity into the past when it times out or fails, so it's read again
+                    room = Room.get(id=room_id)
+                    if room:
+                        self.update_room(room_id, room.last_activity + timedelta(seconds=room.timeout) +
+                                         self.timeout_buffer, now)
+
+    def update_room(self, room_id: UUID, timeout: datetime, now: datetime):
+        """Records room activity lasting until timeout and starts the room if it is not running."""
+        if timeout <= now:
+            return
+        if timeout > self.room_timeouts.get(room_id, now):
+            self.room_timeouts[room_id] = timeout
+            heapq.heappush(self.timeouts, (timeout, room_id))
+        if room_id not in self.room_hosters:
+            # a crashed hoster reports no memory and loses its rooms, it would attract every new room otherwise
+            live_hosters = [hoster for hoster in self.hosters if not hoster.done()]
+            if not live_hosters:
+                logging.error(f"No hoster is running to start room {room_id}.")
+                return
+            hoster = min(live_hosters, key=lambda hoster: (len(hoster.room_ids), hoster.get_memory_usage()))
+            self.room_hosters[room_id] = hoster
+            hoster.start_room(room_id)
+
+
 def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
@@ -83,15 +167,11 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
-                while not stop_event.wait(0.1):
-                    with db_session:
-                        rooms = select(
-                            room for room in Room if
-                            room.last_activity >= datetime.utcnow() - timedelta(days=3))
-                        for room in rooms:
-                            # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
-                                hosters[room.id.int % len(hosters)].start_room(room.id)
+                scheduler = RoomScheduler(hosters)
+                while not stop_event.is_set():
+                    _room_activity_event.clear()
+                    scheduler.poll()
+                    _room_activity_event.wait(scheduler.poll_interval)
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -147,6 +227,9 @@ class MultiworldInstance():
         self.cert = config["SELFLAUNCHCERT"]
         self.key = config["SELFLAUNCHKEY"]
         self.host = config["HOST_ADDRESS"]
+        self.compression = {"compression": config["ROOM_COMPRESSION"],
+                            "threshold": config["ROOM_COMPRESSION_THRESHOLD"],
+                            "level": config["ROOM_COMPRESSION_LEVEL"]}
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
         self.name = f"MultiHoster{id}"
@@ -157,21 +240,38 @@ class MultiworldInstance():
 
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
-                                                self.cert, self.key, self.host,
+                                                self.cert, self.key, self.host, self.compression,
                                                 self.rooms_to_start, self.rooms_shutting_down),
                                           name=self.name)
         process.start()
         self.process = process
 
     def start_room(self, room_id):
-        while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
         if room_id in self.room_ids:
             pass  # should already be hosted currently.
         else:
             self.room_ids.add(room_id)
             self.rooms_to_start.put(room_id)
 
+    def get_shut_down_rooms(self) -> typing.List[UUID]:
+        """Returns the rooms that shut down since the last call, they are no longer hosted by this hoster."""
+        shut_down_rooms = []
+        while not self.rooms_shutting_down.empty():
+            room_id = self.rooms_shutting_down.get(block=True, timeout=None)
+            self.room_ids.discard(room_id)
+            shut_down_rooms.append(room_id)
+        return shut_down_rooms
+
+    def get_memory_usage(self) -> int:
+        """Returns the resident memory of the hoster process in bytes, 0 if it is unknown."""
+        if not self.process or not self.process.pid:
+            return 0
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            return 0  # not linux
+
     def stop(self):
         if self.process:
             self.process.terminate()
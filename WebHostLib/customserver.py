@@ -1,25 +1,28 @@
 from __future__ import annotations
 
 import asyncio
-import collections
 import datetime
 import functools
 import logging
 import multiprocessing
+import os
 import pickle
 import random
 import socket
+import tempfile
 import threading
 import time
 import typing
 import sys
+from uuid import UUID
 
 import websockets
 from pony.orm import commit, db_session, select
 
 import Utils
 
-from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert
+from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert, \
+    get_compression_options
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
 from .models import Command, GameDataPackage, Room, db
@@ -57,42 +60,64 @@ class DBCommandProcessor(ServerCommandProcessor):
         self.ctx.logger.info(text)
 
 
+class CommandDispatcher(threading.Thread):
+    """Polls the Commands of all rooms hosted by this process at once and runs them on the rooms' event loop."""
+    poll_interval: typing.ClassVar[float] = 1
+
+    _processors: typing.Dict[UUID, DBCommandProcessor]  # room id -> processor
+
+    def __init__(self):
+        super().__init__(name="CommandDispatcher", daemon=True)
+        self._lock = threading.Lock()
+        self._processors = {}
+
+    def add_room(self, ctx: WebHostContext):
+        with self._lock:
+            self._processors[ctx.room_id] = DBCommandProcessor(ctx)
+
+    def dispatch(self):
+        with self._lock:
+            # rooms that shut down are dropped, their remaining commands will go to the next host of the room
+            self._processors = processors = {room_id: processor for room_id, processor in self._processors.items()
+                                             if not processor.ctx.exit_event.is_set()}
+        if not processors:
+            return
+        room_ids = list(processors)
+        with db_session:
+            for command in select(command for command in Command if command.room.id in room_ids).order_by(Command.id):
+                processor = processors[command.room.id]
+                processor.ctx.main_loop.call_soon_threadsafe(processor, command.commandtext)
+                command.delete()
+            commit()
+
+    def run(self):
+        while 1:
+            try:
+                self.dispatch()
+            except Exception as e:
+                logging.exception(e)
+            time.sleep(self.poll_interval)
+
+
 class WebHostContext(Context):
-    room_id: int
+    room_id: UUID
 
-    def __init__(self, static_server_data: dict, logger: logging.Logger):
-        # static server data is used during _load_game_data to load required data,
+    def __init__(self, static_server_data: StaticServerData, logger: logging.Logger):
+        # static server data is used during load to load the data of the room's games,
         # without needing to import worlds system, which takes quite a bit of memory
         self.static_server_data = static_server_data
         super(WebHostContext, self).__init__("", 0, "", "", 1,
                                              40, True, "enabled", "enabled",
                                              "enabled", 0, 2, logger=logger)
-        del self.static_server_data
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
 
     def _load_game_data(self):
-        for key, value in self.static_server_data.items():
-            # NOTE: attributes are mutable and shared, so they will have to be copied before being modified
-            setattr(self, key, value)
-        self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
-
-    def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            with db_session:
-                commands = select(command for command in Command if command.room.id == self.room_id)
-                if commands:
-                    for command in commands:
-                        self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                        command.delete()
-                    commit()
-            time.sleep(5)
+        pass  # only the games of the room are loaded, see load
 
     @db_session
-    def load(self, room_id: int):
+    def load(self, room_id: UUID):
         self.room_id = room_id
         room = Room.get(id=room_id)
         if room.last_port:
@@ -102,21 +127,17 @@ class WebHostContext(Context):
 
         multidata = self.decompress(room.seed.multidata)
         game_data_packages = {}
+        datapackage = multidata.get("datapackage", {})
+        games = {"Archipelago", *datapackage, *(slot_info.game for slot_info in multidata["slot_info"].values())}
 
-        static_gamespackage = self.gamespackage  # this is shared across all rooms
-        static_item_name_groups = self.item_name_groups
-        static_location_name_groups = self.location_name_groups
-        self.gamespackage = {"Archipelago": static_gamespackage.get("Archipelago", {})}  # this may be modified by _load
-        self.item_name_groups = {"Archipelago": static_item_name_groups.get("Archipelago", {})}
-        self.location_name_groups = {"Archipelago": static_location_name_groups.get("Archipelago", {})}
-
-        for game in list(multidata.get("datapackage", {})):
-            game_data = multidata["datapackage"][game]
+        for game in sorted(games):
+            static_game_data = self.static_server_data.get_game(game)
+            game_data = datapackage.get(game, {})
             if "checksum" in game_data:
-                if static_gamespackage.get(game, {}).get("checksum") == game_data["checksum"]:
+                if static_game_data.get("gamespackage", {}).get("checksum") == game_data["checksum"]:
                     # non-custom. remove from multidata and use static data
                     # games package could be dropped from static data once all rooms embed data package
-                    del multidata["datapackage"][game]
+                    del datapackage[game]
                 else:
                     row = GameDataPackage.get(checksum=game_data["checksum"])
                     if row:  # None if rolled on >= 0.3.9 but uploaded to <= 0.3.8. multidata should be complete
@@ -124,15 +145,14 @@ class WebHostContext(Context):
                         continue
                     else:
                         self.logger.warning(f"Did not find game_data_package for {game}: {game_data['checksum']}")
-            self.gamespackage[game] = static_gamespackage.get(game, {})
-            self.item_name_groups[game] = static_item_name_groups.get(game, {})
-            self.location_name_groups[game] = static_location_name_groups.get(game, {})
-
-        if not game_data_packages:
-            # all static -> use the static dicts directly
-            self.gamespackage = static_gamespackage
-            self.item_name_groups = static_item_name_groups
-            self.location_name_groups = static_location_name_groups
+            # NOTE: static game data is shared across all rooms, so it will have to be copied before being modified
+            if "gamespackage" in static_game_data:  # may be replaced by an embedded data package in _load
+                self.gamespackage[game] = static_game_data["gamespackage"]
+            self.item_name_groups[game] = static_game_data.get("item_name_groups", {})
+            self.location_name_groups[game] = static_game_data.get("location_name_groups", {})
+            if "non_hintable_names" in static_game_data:
+                self.non_hintable_names[game] = static_game_data["non_hintable_names"]
+
         return self._load(multidata, game_data_packages, True)
 
     @db_session
@@ -143,7 +163,6 @@ class WebHostContext(Context):
             if savegame_data:
                 self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
             self._start_async_saving(atexit_save=False)
-        threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
@@ -164,8 +183,59 @@ def get_random_port():
     return random.randint(49152, 65535)
 
 
+class StaticServerData:
+    """
+    Read-only data of all games the WebHost knows, written once by the launcher as one pickle per game.
+    Hoster processes read and unpickle only the games their rooms use, once per process, instead of receiving all of
+    them at start. Only file path and index are sent to processes. Each process holds its own copy of the games it
+    loaded, nothing is shared in memory between processes.
+    """
+    keys: typing.ClassVar[typing.Tuple[str, ...]] = \
+        ("gamespackage", "item_name_groups", "location_name_groups", "non_hintable_names")
+
+    file_path: str
+    index: typing.Dict[str, typing.Tuple[int, int]]  # game -> offset and length of its pickle
+    _games: typing.Dict[str, typing.Dict[str, typing.Any]]
+
+    def __init__(self, file_path: str, index: typing.Dict[str, typing.Tuple[int, int]]):
+        self.file_path = file_path
+        self.index = index
+        self._games = {}
+
+    @classmethod
+    def write(cls, data: typing.Dict[str, typing.Dict[str, typing.Any]], file_path: str) -> StaticServerData:
+        """Writes data, a dict of key -> game -> value, to file_path."""
+        index: typing.Dict[str, typing.Tuple[int, int]] = {}
+        with open(file_path, "wb") as f:
+            for game in sorted(set().union(*(data[key] for key in cls.keys))):
+                game_data = {key: data[key][game] for key in cls.keys if game in data[key]}
+                pickled = pickle.dumps(game_data, pickle.HIGHEST_PROTOCOL)
+                index[game] = f.tell(), len(pickled)
+                f.write(pickled)
+        return cls(file_path, index)
+
+    def __getstate__(self) -> typing.Tuple[str, typing.Dict[str, typing.Tuple[int, int]]]:
+        return self.file_path, self.index
+
+    def __setstate__(self, state: typing.Tuple[str, typing.Dict[str, typing.Tuple[int, int]]]) -> None:
+        self.__init__(*state)
+
+    def get_game(self, game: str) -> typing.Dict[str, typing.Any]:
+        """Returns the data of game by key, empty if game is unknown. The data is shared and must not be modified."""
+        game_data = self._games.get(game)
+        if game_data is None:
+            if game not in self.index:
+                return {}
+            offset, length = self.index[game]
+            with open(self.file_path, "rb") as f:
+                f.seek(offset)
+                game_data = self._games[game] = pickle.loads(f.read(length))
+        return game_data
+
+
 @cache_argsless
-def get_static_server_data() -> dict:
+def get_static_server_data() -> StaticServerData:
+    import atexit
     import worlds
     data = {
         "non_hintable_names": {
@@ -190,7 +260,10 @@ def get_static_server_data() -> dict:
         },
     }
 
-    return data
+    file_descriptor, file_path = tempfile.mkstemp(prefix="ap_static_server_data_", suffix=".pickle")
+    os.close(file_descriptor)
+    atexit.register(os.remove, file_path)
+    return StaticServerData.write(data, file_path)
 
 
 def set_up_logging(room_id) -> logging.Logger:
@@ -213,9 +286,10 @@ def set_up_logging(room_id) -> logging.Logger:
     return logger
 
 
-def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
+def run_server_process(name: str, ponyconfig: dict, static_server_data: StaticServerData,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, compression: typing.Dict[str, typing.Any],
+                       rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
     Utils.init_logging(name)
     try:
         import resource
@@ -237,10 +311,13 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
 
     import gc
     ssl_context = load_server_cert(cert_file, cert_key_file) if cert_file else None
+    compression_options = get_compression_options(**compression)
     del cert_file, cert_key_file, ponyconfig
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    command_dispatcher = CommandDispatcher()
+    command_dispatcher.start()
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
@@ -249,14 +326,15 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 ctx = WebHostContext(static_server_data, logger)
                 ctx.load(room_id)
                 ctx.init_save()
+                command_dispatcher.add_room(ctx)
                 try:
                     ctx.server = websockets.serve(
-                        functools.partial(server, ctx=ctx), ctx.host, ctx.port, ssl=ssl_context)
+                        functools.partial(server, ctx=ctx), ctx.host, ctx.port, ssl=ssl_context, **compression_options)
 
                     await ctx.server
                 except OSError:  # likely port in use
                     ctx.server = websockets.serve(
-                        functools.partial(server, ctx=ctx), ctx.host, 0, ssl=ssl_context)
+                        functools.partial(server, ctx=ctx), ctx.host, 0, ssl=ssl_context, **compression_options)
 
                     await ctx.server
                 port = 0
@@ -94,6 +94,8 @@ def new_room(seed: UUID):
         abort(404)
     room = Room(seed=seed, owner=session["_id"], tracker=uuid4())
     commit()
+    from .autolauncher import notify_room_activity
+    notify_room_activity()
     return redirect(url_for("host_room", room=room.id))
 
 
@@ -149,6 +151,8 @@ def host_room(room: UUID):
     should_refresh = not room.last_port and now - room.creation_time < datetime.timedelta(seconds=3)
     with db_session:
         room.last_activity = now  # will trigger a spinup, if it's not already running
+    from .autolauncher import notify_room_activity
+    notify_room_activity()  # spin up right away, if the autohost runs in this process
 
     def get_log(max_size: int = 1024000) -> str:
         try:
@@ -132,11 +132,103 @@ window.addEventListener('load', () => {
         return sleepSeconds || 60;
     }
 
+    // Trackers offering an updates feed only download what changed since the cursor and patch their tables.
+    const trackerWrapper = document.getElementById('tracker-wrapper');
+    const updatesUrl = trackerWrapper.getAttribute('data-updates');
+
+    // Cells rendered by the server hold escaped text, so patched in cells have to as well.
+    const escapeHtml = (text) => $('<div></div>').text(text).html();
+
+    const findRow = (table, cell) => table.rows().indexes().toArray().find(
+        (index) => table.row(index).data()[0] === cell
+    );
+
+    const patchTracker = (updates) => {
+        // sections listed in replace are sent in full, instead of only what changed since the cursor
+        const replace = updates.replace || [];
+        if (updates.received_items) {
+            const receivedTable = tables.table('#received-table');
+            if (replace.includes('received_items')) {
+                receivedTable.clear();
+            }
+            updates.received_items.forEach(([name, count, order]) => {
+                const rowData = [escapeHtml(name), count, order];
+                const index = findRow(receivedTable, rowData[0]);
+                if (index === undefined) {
+                    receivedTable.row.add(rowData);
+                } else {
+                    receivedTable.row(index).data(rowData);
+                }
+            });
+        }
+        if (updates.checked_locations) {
+            const locationsTable = tables.table('#locations-table');
+            if (replace.includes('checked_locations')) {
+                locationsTable.rows().indexes().each((index) => locationsTable.cell(index, 1).data(''));
+            }
+            updates.checked_locations.forEach((name) => {
+                const index = findRow(locationsTable, escapeHtml(name));
+                if (index !== undefined) {
+                    locationsTable.cell(index, 1).data('✔');
+                }
+            });
+        }
+        if (updates.hints) {
+            const hintsTable = tables.table('#hints-table');
+            const bold = (text, isPlayer) => isPlayer ? `<b>${escapeHtml(text)}</b>` : escapeHtml(text);
+            if (replace.includes('hints')) {
+                hintsTable.clear();
+            }
+            updates.hints.forEach((hint) => {
+                const rowData = [
+                    bold(hint.finding_player, hint.finder_is_player),
+                    bold(hint.receiving_player, hint.receiver_is_player),
+                    escapeHtml(hint.item),
+                    escapeHtml(hint.location),
+                    escapeHtml(hint.game),
+                    escapeHtml(hint.entrance || 'Vanilla'),
+                    hint.found ? '✔' : '',
+                ];
+                // a hint that got found replaces its row, which may have been rendered by the server
+                const text = [hint.finding_player, hint.receiving_player, hint.item, hint.location, hint.game,
+                    hint.entrance || 'Vanilla'];
+                const cellText = (index, i) => $('<div>').html(hintsTable.row(index).data()[i]).text().trim();
+                const index = hintsTable.rows().indexes().toArray().find(
+                    (index) => text.every((cell, i) => cellText(index, i) === cell)
+                );
+                if (index === undefined) {
+                    const row = hintsTable.row.add(rowData);
+                    $(row.node()).children().last().addClass('center-column');
+                } else {
+                    hintsTable.row(index).data(rowData);
+                }
+            });
+        }
+        trackerWrapper.setAttribute('data-cursor', JSON.stringify(updates.cursor));
+        tables.draw(false);
+    };
+
     let update_on_view = false;
     const update = () => {
         if (document.hidden) {
             console.log("Document reporting as not visible, not updating Tracker...");
             update_on_view = true;
+        } else if (updatesUrl) {
+            update_on_view = false;
+            console.log("Updating Tracker...");
+            $.ajax({
+                url: updatesUrl,
+                data: JSON.parse(trackerWrapper.getAttribute('data-cursor')),
+                dataType: 'json',
+                ifModified: true,
+            }).done((updates, status) => {
+                if (status !== 'notmodified' && updates) {
+                    patchTracker(updates);
+                }
+            }).fail((response) => {
+                console.log("Failed to connect to Server, in order to update Table Data.");
+                console.log(response);
+            });
         } else {
             update_on_view = false;
             const target = $("<div></div>");
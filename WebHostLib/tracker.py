@@ -1,7 +1,10 @@
 import datetime
 import collections
+import functools
+import threading
+import zlib
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
 from email.utils import parsedate_to_datetime
 
@@ -12,12 +15,22 @@ from MultiServer import Context, get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, Seed
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
-
-_multidata_cache = {}
+# Decoded data kept across requests, for the most recently viewed seeds, game data packages and rooms.
+MULTIDATA_CACHE_SIZE = 16
+GAME_PACKAGE_CACHE_SIZE = 128
+MULTISAVE_CACHE_SIZE = 64
+# Checked locations and hints per player and multisave version, to send trackers only what changed since.
+TRACKER_SNAPSHOT_CACHE_SIZE = 1024
+
+_multisave_cache: "collections.OrderedDict[UUID, Tuple[Tuple[int, int], Dict[str, Any]]]" = \
+    collections.OrderedDict()
+_multisave_cache_lock = threading.Lock()
+_tracker_snapshots: "collections.OrderedDict[Tuple[UUID, int, int, int], TrackerSnapshot]" = collections.OrderedDict()
+_tracker_snapshots_lock = threading.Lock()
 _multiworld_trackers: Dict[str, Callable] = {}
 _player_trackers: Dict[str, Callable] = {}
 
@@ -41,23 +54,90 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+@functools.lru_cache(maxsize=MULTIDATA_CACHE_SIZE)
+def _get_multidata(seed_id: UUID) -> Dict[str, Any]:
+    """Returns the decoded multidata of a seed. Shared across requests, so it must not be modified."""
+    return Context.decompress(Seed.get(id=seed_id).multidata)
+
+
+class SharedKeyedDefaultDict(dict):
+    """KeyedDefaultDict variant for lookups shared across requests and threads, which doesn't store missing keys."""
+    default_factory: Callable[[Any], Any]
+
+    def __init__(self, default_factory: Callable[[Any], Any], seq: Dict[Any, Any]):
+        super().__init__(seq)
+        self.default_factory = default_factory
+
+    def __missing__(self, key: Any) -> Any:
+        return self.default_factory(key)
+
+
+class GamePackageLookups(NamedTuple):
+    item_id_to_name: Dict[int, str]
+    location_id_to_name: Dict[int, str]
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+
+
+@functools.lru_cache(maxsize=GAME_PACKAGE_CACHE_SIZE)
+def _get_game_package_lookups(checksum: str) -> GamePackageLookups:
+    """Returns the lookup tables of a game data package. Shared across requests, so they must not be modified."""
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    return GamePackageLookups(
+        SharedKeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
+            id: name for name, id in game_package["item_name_to_id"].items()}),
+        SharedKeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
+            id: name for name, id in game_package["location_name_to_id"].items()}),
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    )
+
+
+def _get_multisave(room: Room) -> Tuple[int, Dict[str, Any]]:
+    """Returns the CRC32 of a room's multisave, which serves as its version, and the decoded multisave.
+    It's only decoded again after it changed. Shared across requests, so it must not be modified."""
+    data = room.multisave or b""
+    # last_activity is not touched by the save when a room shuts down, so the save itself identifies its version
+    key = len(data), zlib.crc32(data)
+    with _multisave_cache_lock:
+        cached = _multisave_cache.get(room.id)
+        if cached and cached[0] == key:
+            _multisave_cache.move_to_end(room.id)
+            return key[1], cached[1]
+
+    multisave = restricted_loads(data) if data else {}
+    with _multisave_cache_lock:
+        _multisave_cache[room.id] = key, multisave
+        _multisave_cache.move_to_end(room.id)
+        while len(_multisave_cache) > MULTISAVE_CACHE_SIZE:
+            _multisave_cache.popitem(last=False)
+    return key[1], multisave
+
+
+class TrackerSnapshot(NamedTuple):
+    checked_locations: FrozenSet[int]
+    hints: FrozenSet[Hint]
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
 
     Provides helper methods to lazily load necessary data that each tracker require and caches any results so any
     subsequent helper method calls do not need to recompute results during the lifetime of this instance.
+    The decoded multidata, multisave and data package lookups are shared with other requests, see _get_multidata.
     """
     room: Room
     _multidata: Dict[str, Any]
     _multisave: Dict[str, Any]
+    _multisave_version: int
     _tracker_cache: Dict[str, Any]
 
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._multidata = _get_multidata(room.seed.id)
+        self._multisave_version, self._multisave = _get_multisave(room)
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
@@ -71,15 +151,13 @@ class TrackerData:
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            lookups = _get_game_package_lookups(game_package["checksum"])
+            self.item_id_to_name[game] = lookups.item_id_to_name
+            self.location_id_to_name[game] = lookups.location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["item_name_to_id"]
+            self.item_name_to_id[game] = lookups.item_name_to_id
+            self.location_name_to_id[game] = lookups.location_name_to_id
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -140,6 +218,45 @@ class TrackerData:
         """Retrieves a set of all hints relevant for a particular player."""
         return self._multisave.get("hints", {}).get((team, player), set())
 
+    def get_player_tracker_cursor(self, team: int, player: int) -> Dict[str, int]:
+        """Retrieves counters of a player's received items, checked locations and hints, for the tracker updates feed.
+        As all of these only ever grow, and hints only turn found, each counter changes exactly when its data did.
+        Also remembers the checked locations and hints at the cursor's version, see get_player_tracker_snapshot.
+        """
+        checked_locations = self.get_player_checked_locations(team, player)
+        hints = self.get_player_hints(team, player)
+        key = self.room.id, team, player, self._multisave_version
+        with _tracker_snapshots_lock:
+            if key in _tracker_snapshots:
+                _tracker_snapshots.move_to_end(key)
+            else:
+                _tracker_snapshots[key] = TrackerSnapshot(frozenset(checked_locations), frozenset(hints))
+                while len(_tracker_snapshots) > TRACKER_SNAPSHOT_CACHE_SIZE:
+                    _tracker_snapshots.popitem(last=False)
+        return {
+            "items": len(self.get_player_received_items(team, player)),
+            "checks": len(checked_locations),
+            "hints": sum(1 + hint.found for hint in hints),
+            "version": self._multisave_version,
+        }
+
+    def get_player_tracker_snapshot(self, team: int, player: int,
+                                    version: Optional[int]) -> Optional[TrackerSnapshot]:
+        """Retrieves a player's checked locations and hints as of an earlier cursor's version, if still known."""
+        with _tracker_snapshots_lock:
+            return _tracker_snapshots.get((self.room.id, team, player, version))
+
+    def get_player_received_items_in_order(self, team: int, player: int) -> Dict[int, int]:
+        """Retrieves the position each item was last received at, counting the starting inventory first."""
+        received_items_in_order = {}
+        starting_inventory = self.get_player_starting_inventory(team, player)
+        for index, item in enumerate(starting_inventory):
+            received_items_in_order[item] = index
+        for index, network_item in enumerate(self.get_player_received_items(team, player),
+                                             start=len(starting_inventory)):
+            received_items_in_order[network_item.item] = index
+        return received_items_in_order
+
     @_cache_results
     def get_player_last_activity(self, team: int, player: int) -> Optional[datetime.timedelta]:
         """Retrieves the relative timedelta for when a particular player was last active.
@@ -305,6 +422,8 @@ def _process_if_request_valid(incoming_request, room: Optional[Room]) -> Optiona
     if_modified = incoming_request.headers.get("If-Modified-Since", None)
     if if_modified:
         if_modified = parsedate_to_datetime(if_modified)
+        if if_modified.tzinfo:  # last_activity is naive utc
+            if_modified = if_modified.astimezone(datetime.timezone.utc).replace(tzinfo=None)
         # if_modified has less precision than last_activity, so we bring them to same precision
         if if_modified >= room.last_activity.replace(microsecond=0):
             return make_response("",  304)
@@ -346,6 +465,83 @@ def get_timeout_and_player_tracker(room: Room, tracked_team: int, tracked_player
             % TRACKER_CACHE_TIMEOUT_IN_SECONDS or TRACKER_CACHE_TIMEOUT_IN_SECONDS, room.last_activity, tracker)
 
 
+@app.route("/tracker/<suuid:tracker>/<int:tracked_team>/<int:tracked_player>/updates")
+def get_player_tracker_updates(tracker: UUID, tracked_team: int, tracked_player: int) -> Response:
+    """Returns what changed on a player's generic tracker since the cursor given as query arguments,
+    so the page can patch itself instead of downloading and rendering the whole tracker again."""
+    room = Room.get(tracker=tracker)
+    response = _process_if_request_valid(request, room)
+    if response:
+        return response
+
+    tracker_data = TrackerData(room)
+    team, player = tracked_team, tracked_player
+    if player not in tracker_data.get_all_slots().get(team, ()):
+        abort(404)
+    game = tracker_data.get_player_game(team, player)
+    cursor = tracker_data.get_player_tracker_cursor(team, player)
+    known = tracker_data.get_player_tracker_snapshot(team, player, request.args.get("version", type=int))
+    updates: Dict[str, Any] = {"cursor": cursor}
+    # sections sent in full, which replace what the page shows instead of adding to it
+    replace: List[str] = []
+
+    items_seen = request.args.get("items", 0, type=int)
+    if items_seen != cursor["items"]:
+        item_id_to_name = tracker_data.item_id_to_name[game]
+        inventory = tracker_data.get_player_inventory_counts(team, player)
+        if items_seen > cursor["items"]:
+            # the page is ahead of the save, e.g. after a rollback, so it may show items the save doesn't have
+            new_items = {item: order for item, order
+                         in tracker_data.get_player_received_items_in_order(team, player).items() if inventory[item]}
+            replace.append("received_items")
+        else:
+            first_order = len(tracker_data.get_player_starting_inventory(team, player))
+            new_items = {}
+            for index, network_item in enumerate(tracker_data.get_player_received_items(team, player)[items_seen:],
+                                                 start=first_order + items_seen):
+                new_items[network_item.item] = index
+        updates["received_items"] = [(item_id_to_name[item], inventory[item], order)
+                                     for item, order in new_items.items()]
+
+    if request.args.get("checks", 0, type=int) != cursor["checks"]:
+        location_id_to_name = tracker_data.location_id_to_name[game]
+        checked_locations = tracker_data.get_player_checked_locations(team, player)
+        if known and known.checked_locations <= checked_locations:
+            new_locations = checked_locations - known.checked_locations
+        else:
+            new_locations = checked_locations
+            replace.append("checked_locations")
+        updates["checked_locations"] = [location_id_to_name[location] for location in sorted(new_locations)]
+
+    if request.args.get("hints", 0, type=int) != cursor["hints"]:
+        hints = tracker_data.get_player_hints(team, player)
+        if known and all(hint in hints or hint._replace(found=True) in hints for hint in known.hints):
+            new_hints = hints - known.hints
+        else:
+            new_hints = hints
+            replace.append("hints")
+        games = tracker_data.get_room_games()
+        names = tracker_data.get_room_long_player_names()
+        updates["hints"] = [{
+            "finding_player": names[team, hint.finding_player],
+            "receiving_player": names[team, hint.receiving_player],
+            "item": tracker_data.item_id_to_name[games[team, hint.receiving_player]][hint.item],
+            "location": tracker_data.location_id_to_name[games[team, hint.finding_player]][hint.location],
+            "game": games[team, hint.finding_player],
+            "entrance": hint.entrance,
+            "found": hint.found,
+            "finder_is_player": hint.finding_player == player,
+            "receiver_is_player": hint.receiving_player == player,
+        } for hint in new_hints]
+
+    if replace:
+        updates["replace"] = replace
+
+    response = make_response(updates)
+    response.last_modified = room.last_activity
+    return response
+
+
 @app.route("/generic_tracker/<suuid:tracker>/<int:tracked_team>/<int:tracked_player>")
 def get_generic_game_tracker(tracker: UUID, tracked_team: int, tracked_player: int) -> Response:
     return get_player_tracker(tracker, tracked_team, tracked_player, True)
@@ -403,14 +599,6 @@ def get_enabled_multiworld_trackers(room: Room) -> Dict[str, Callable]:
 def render_generic_tracker(tracker_data: TrackerData, team: int, player: int) -> str:
     game = tracker_data.get_player_game(team, player)
 
-    received_items_in_order = {}
-    starting_inventory = tracker_data.get_player_starting_inventory(team, player)
-    for index, item in enumerate(starting_inventory):
-        received_items_in_order[item] = index
-    for index, network_item in enumerate(tracker_data.get_player_received_items(team, player),
-                                         start=len(starting_inventory)):
-        received_items_in_order[network_item.item] = index
-
     return render_template(
         template_name_or_list="genericTracker.html",
         game_specific_tracker=game in _player_trackers,
@@ -421,7 +609,7 @@ def render_generic_tracker(tracker_data: TrackerData, team: int, player: int) ->
         inventory=tracker_data.get_player_inventory_counts(team, player),
         locations=tracker_data.get_player_locations(team, player),
         checked_locations=tracker_data.get_player_checked_locations(team, player),
-        received_items=received_items_in_order,
+        received_items=tracker_data.get_player_received_items_in_order(team, player),
         saving_second=tracker_data.get_room_saving_second(),
         game=game,
         games=tracker_data.get_room_games(),
@@ -429,6 +617,7 @@ def render_generic_tracker(tracker_data: TrackerData, team: int, player: int) ->
         location_id_to_name=tracker_data.location_id_to_name,
         item_id_to_name=tracker_data.item_id_to_name,
         hints=tracker_data.get_player_hints(team, player),
+        cursor=tracker_data.get_player_tracker_cursor(team, player),
     )
 
 
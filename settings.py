@@ -586,6 +586,19 @@ class ServerOptions(Group):
         OFF = 0
         ON = 1
 
+    class Compression(str):
+        """
+        Compression of websocket messages
+        "deflate" -> compress messages for clients that support permessage-deflate
+        "off" -> never compress, using less cpu time and memory but more bandwidth
+        """
+
+    class CompressionThreshold(int):
+        """Send messages smaller than this many bytes uncompressed, as compressing them barely saves anything"""
+
+    class CompressionLevel(int):
+        """zlib compression level from 1, fastest, to 9, smallest, or -1 for the zlib default"""
+
     host: Optional[str] = None
     port: int = 38281
     password: Optional[str] = None
@@ -603,6 +616,9 @@ class ServerOptions(Group):
     auto_shutdown: AutoShutdown = AutoShutdown(0)
     compatibility: Compatibility = Compatibility(2)
     log_network: LogNetwork = LogNetwork(0)
+    compression: Compression = Compression("deflate")
+    compression_threshold: CompressionThreshold = CompressionThreshold(128)
+    compression_level: CompressionLevel = CompressionLevel(-1)
 
 
 class GeneratorOptions(Group):
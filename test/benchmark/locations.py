@@ -12,6 +12,7 @@ def run_locations_benchmark():
     from BaseClasses import MultiWorld, CollectionState, Location
     from worlds import AutoWorld
     from worlds.AutoWorld import call_all
+    from worlds.generic.DeclarativeRules import And, CanReach, Has, HasAll, HasAny, Opaque, Or, Rule, get_rule
 
     init_logging("Benchmark Runner")
     logger = logging.getLogger("Benchmark")
@@ -40,11 +41,49 @@ def run_locations_benchmark():
                 gc.collect()
             return t.dif
 
+        @staticmethod
+        def as_lambdas(rule: Rule) -> typing.Callable[[CollectionState], bool]:
+            """Rebuilds a declarative rule out of lambdas, chained like add_rule chains other rules."""
+            if isinstance(rule, Has):
+                item, player, count = rule.item, rule.player, rule.count
+                return lambda state: state.has(item, player, count)
+            if isinstance(rule, HasAll):
+                items, player = rule.items, rule.player
+                return lambda state: state.has_all(items, player)
+            if isinstance(rule, HasAny):
+                items, player = rule.items, rule.player
+                return lambda state: state.has_any(items, player)
+            if isinstance(rule, CanReach):
+                spot, resolution_hint, player = rule.spot, rule.resolution_hint, rule.player
+                return lambda state: state.can_reach(spot, resolution_hint, player)
+            if isinstance(rule, Opaque):
+                return rule.rule
+            if isinstance(rule, (And, Or)):
+                chain = BenchmarkRunner.as_lambdas(rule.rules[-1])
+                for part in map(BenchmarkRunner.as_lambdas, reversed(rule.rules[:-1])):
+                    if isinstance(rule, And):
+                        chain = (lambda first, second: lambda state: first(state) and second(state))(part, chain)
+                    else:
+                        chain = (lambda first, second: lambda state: first(state) or second(state))(part, chain)
+                return chain
+            return rule.get_evaluator()  # already compiled parts
+
+        def declarative_rule_test(self, test_location: Location, state: CollectionState, state_name: str) -> float:
+            """Time the access rule as chained lambdas, to compare against its compiled form."""
+            lambdas = self.as_lambdas(get_rule(test_location.access_rule))
+            with TimeIt(f"{test_location.game} {self.rule_iterations} "
+                        f"runs of {test_location}.access_rule as lambdas({state_name})", logger) as t:
+                for _ in range(self.rule_iterations):
+                    lambdas(state)
+                gc.collect()
+            return t.dif
+
         def main(self):
             for game in sorted(AutoWorld.AutoWorldRegister.world_types):
                 summary_data: typing.Dict[str, collections.Counter[str]] = {
                     "empty_state": collections.Counter(),
                     "all_state": collections.Counter(),
+                    "declarative_speedup": collections.Counter(),
                 }
                 try:
                     multiworld = MultiWorld(1)
@@ -77,6 +116,10 @@ def run_locations_benchmark():
                         time_taken = self.location_test(location, all_state, "all_state")
                         summary_data["all_state"][location.name] = time_taken
 
+                        if get_rule(location.access_rule):
+                            time_as_lambdas = self.declarative_rule_test(location, all_state, "all_state")
+                            summary_data["declarative_speedup"][location.name] = time_as_lambdas / time_taken
+
                     total_empty_state = sum(summary_data["empty_state"].values())
                     total_all_state = sum(summary_data["all_state"].values())
 
@@ -87,6 +130,11 @@ def run_locations_benchmark():
                                 f"{self.format_times_from_counter(summary_data['empty_state'])}")
                     logger.info(f"Top times in all_state:\n"
                                 f"{self.format_times_from_counter(summary_data['all_state'])}")
+                    if summary_data["declarative_speedup"]:
+                        speedups = summary_data["declarative_speedup"]
+                        logger.info(f"{game} declarative rules are {sum(speedups.values()) / len(speedups):.2f} "
+                                    f"times as fast compiled as chained lambdas in all_state. Top speedups:\n"
+                                    f"{self.format_times_from_counter(speedups)}")
 
                 except Exception as e:
                     logger.exception(e)
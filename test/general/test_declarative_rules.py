@@ -0,0 +1,99 @@
+import itertools
+import unittest
+from unittest import mock
+
+from BaseClasses import CollectionState, Region
+from worlds.generic.DeclarativeRules import CanReach, Has, HasAll, HasAny, build_evaluator, evaluate_rules, get_rule
+from worlds.generic.Rules import add_rule, set_rule
+from . import generate_items, generate_locations, generate_test_multiworld
+
+
+class TestDeclarativeRules(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.items = generate_items(4, 1, True)
+        self.names = [item.name for item in self.items]
+        region = Region("Room", 1, self.multiworld)
+        self.multiworld.regions.append(region)
+        self.multiworld.get_region("Menu", 1).connect(region, "Door", lambda state: state.has(self.names[3], 1))
+        self.rules = [
+            Has(self.names[0], 1),
+            Has(self.names[0], 1, 2),
+            HasAll(self.names[:2], 1) | Has(self.names[2], 1),
+            HasAny(self.names[1:3], 1) & Has(self.names[0], 1) & (lambda state: state.has(self.names[3], 1)),
+            (Has(self.names[0], 1) | Has(self.names[1], 1)) & (Has(self.names[2], 1) | CanReach("Room", "Region", 1)),
+            # too many alternatives to multiply out completely
+            HasAny(self.names, 1) & HasAny(self.names[1:], 1) & HasAny(self.names[:3], 1) & Has(self.names[0], 1, 2)
+            & (HasAny(self.names[1:], 1) | Has(self.names[0], 1, 3)),
+        ]
+
+    def get_states(self):
+        for counts in itertools.product(range(3), range(2), range(2), range(2)):
+            state = CollectionState(self.multiworld)
+            for item, count in zip(self.items, counts):
+                for _ in range(count):
+                    state.collect(item, True)
+            yield state
+
+    def test_compiled_matches_evaluate(self) -> None:
+        """Test that compiled rules give the same results as evaluating them as written"""
+        for rule in self.rules:
+            for state in self.get_states():
+                with self.subTest(rule=rule, items=state.prog_items[1]):
+                    self.assertEqual(rule(state), rule.evaluate(state))
+
+    def test_batch_evaluation(self) -> None:
+        """Test that evaluating many states or many rules at once gives the same results as one at a time"""
+        states = list(self.get_states())
+        for rule in self.rules:
+            self.assertEqual(rule.evaluate_states(states), [rule(state) for state in states])
+        for state in states:
+            self.assertEqual(evaluate_rules(self.rules, state), [rule(state) for rule in self.rules])
+
+    def test_add_rule_combines(self) -> None:
+        """Test that add_rule keeps declarative rules declarative and their item names known"""
+        location = generate_locations(1, 1, self.multiworld.get_region("Menu", 1))[0]
+        set_rule(location, Has(self.names[0], 1))
+        add_rule(location, HasAll(self.names[1:3], 1))
+        add_rule(location, Has(self.names[3], 1), "or")
+        self.assertEqual(get_rule(location.access_rule).item_names, frozenset(self.names))
+        add_rule(location, lambda state: True)
+        self.assertIsNone(get_rule(location.access_rule).item_names)
+        for state in self.get_states():
+            self.assertEqual(location.access_rule(state),
+                             state.has_all(self.names[:3], 1) or state.has(self.names[3], 1))
+
+    def test_add_rule_compiles_once(self) -> None:
+        """Test that rules built up by add_rule are only compiled when first checked, and only once"""
+        location = generate_locations(1, 1, self.multiworld.get_region("Menu", 1))[0]
+        with mock.patch("worlds.generic.DeclarativeRules.build_evaluator", wraps=build_evaluator) as build:
+            set_rule(location, Has(self.names[0], 1))
+            for name in self.names[1:]:
+                add_rule(location, Has(name, 1))
+            self.assertEqual(build.call_count, 0)
+            for state in self.get_states():
+                self.assertEqual(location.access_rule(state), state.has_all(self.names, 1))
+            self.assertEqual(build.call_count, 1)
+        self.assertIs(location.access_rule, get_rule(location.access_rule).get_evaluator())
+
+    def test_add_rule_keeps_order(self) -> None:
+        """Test that add_rule'd declarative rules are checked in the same order as chained lambdas"""
+        calls = []
+
+        def record(name, item):
+            return lambda state: calls.append(name) or state.has(item, 1)
+
+        locations = generate_locations(2, 1, self.multiworld.get_region("Menu", 1))
+        for location, item_rule in zip(locations, (Has(self.names[0], 1),
+                                                   lambda state: state.has(self.names[0], 1))):
+            set_rule(location, record("expensive", self.names[2]))
+            add_rule(location, item_rule)
+            add_rule(location, record("cheap", self.names[1]))
+        self.assertIsNotNone(get_rule(locations[0].access_rule))
+        self.assertIsNone(get_rule(locations[1].access_rule))
+        for state in self.get_states():
+            results = []
+            for location in locations:
+                calls.clear()
+                results.append((location.access_rule(state), list(calls)))
+            self.assertEqual(results[0], results[1])
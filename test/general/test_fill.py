@@ -3,7 +3,7 @@ import unittest
 
 from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
-from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
+from Fill import FillError, PlacementCache, balance_multiworld_progression, fill_restrictive, \
     distribute_early_items, distribute_items_restrictive
 from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
@@ -463,6 +463,36 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertEqual(1, len(player1.prog_items))
         self.assertIsNot(loc0.item, player1.prog_items[0], "Filled item was still present in item pool")
 
+    def test_placement_cache_matches_can_fill(self):
+        """Test that the placement cache gives the same results as Location.can_fill"""
+        multiworld = generate_test_multiworld()
+        player1 = generate_player_data(multiworld, 1, 4, 2, 1)
+        locations = player1.locations
+        items = player1.prog_items + player1.basic_items
+        set_rule(locations[0], lambda state: state.has(items[0].name, player1.id))
+        add_item_rule(locations[1], lambda item: item.name != items[1].name)
+        locations[2].progress_type = LocationProgressType.EXCLUDED
+        locations[3].always_allow = lambda state, item: item.name == items[0].name
+        add_item_rule(locations[3], lambda item: False)
+
+        for state in (multiworld.state, multiworld.get_all_state(False)):
+            remaining = list(locations)
+            cache = PlacementCache(remaining)
+            for item in items:
+                for check_access in (False, True):
+                    for player in (None, player1.id, player1.id + 1):
+                        expected = next((location for location in remaining
+                                         if (player is None or location.player == player)
+                                         and location.can_fill(state, item, check_access)), None)
+                        self.assertIs(cache.find(state, item, check_access, player), expected,
+                                      f"{item} with check_access={check_access} for player {player}")
+                for location in remaining:
+                    if cache.never_fills(location, item):
+                        self.assertFalse(location.can_fill(state, item, False), f"{item} at {location}")
+            cache.remove(locations[1])
+            cache.remove(locations[0])
+            self.assertEqual(remaining, locations[2:])
+
 
 class TestDistributeItemsRestrictive(unittest.TestCase):
     def test_basic_distribute(self):
@@ -1,5 +1,7 @@
+import sys
 import unittest
 
+from BaseClasses import Item, ItemClassification
 from worlds.AutoWorld import AutoWorldRegister, call_all
 from . import setup_solo_multiworld
 
@@ -14,6 +16,12 @@ class TestBase(unittest.TestCase):
                     item = proxy_world.create_item(item_name)
                     self.assertEqual(item.name, item_name)
 
+    def test_item_name_interned(self):
+        """Test that items intern their names, which makes looking them up cheaper"""
+        name = " ".join(("Test", "Item"))  # built at runtime, so not interned yet
+        item = Item(name, ItemClassification.progression, None, 1)
+        self.assertIs(item.name, sys.intern("Test Item"))
+
     def test_item_name_group_has_valid_item(self):
         """Test that all item name groups contain valid items. """
         # This cannot test for Event names that you may have declared for logic, only sendable Items.
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from BaseClasses import CollectionState, MultiWorld, Region
+from Profiler import GenerationProfiler, ProfiledRule
+from worlds.AutoWorld import call_all
+from . import TestWorld, generate_items, generate_locations, generate_test_multiworld
+
+
+class TestGenerationProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.profiler = self.multiworld.profiler = GenerationProfiler(self.multiworld)
+        self.item = generate_items(1, 1, True)[0]
+        region = Region("Room", 1, self.multiworld)
+        self.multiworld.regions.append(region)
+        self.multiworld.get_region("Menu", 1).connect(region, "Door", lambda state: state.has(self.item.name, 1))
+        self.location = generate_locations(1, 1, region)[0]
+        self.location.access_rule = lambda state: True
+
+    def test_records_stages(self) -> None:
+        """Test that stages called through call_all are recorded per player"""
+        call_all(self.multiworld, "generate_basic")
+        players = self.profiler.to_dict()["players"]
+        self.assertEqual(set(players), {"1", "2"})
+        for player_data in players.values():
+            self.assertIn("generate_basic", player_data["stages"])
+
+    def test_records_static_stages(self) -> None:
+        """Test that stage_ methods are recorded per game, also if they are staticmethods"""
+        def stage_generate_basic(multiworld: MultiWorld) -> None:
+            pass
+
+        with mock.patch.object(TestWorld, "stage_generate_basic", staticmethod(stage_generate_basic), create=True):
+            call_all(self.multiworld, "generate_basic")
+        self.assertIn("stage_generate_basic", self.profiler.to_dict()["world_stages"][TestWorld.game])
+
+    def test_counts_rules(self) -> None:
+        """Test that instrumented rules are counted and keep their result, and default rules are left alone"""
+        self.profiler.instrument_rules()
+        self.profiler.instrument_rules()
+        self.assertIsInstance(self.location.access_rule, ProfiledRule)
+        self.assertNotIsInstance(self.multiworld.get_entrance("Door", 1).access_rule.rule, ProfiledRule)
+        self.assertEqual(len(self.profiler.rules), 2)
+
+        state = CollectionState(self.multiworld)
+        self.assertFalse(self.location.can_reach(state))
+        state.collect(self.item, True)
+        self.assertTrue(self.location.can_reach(state))
+
+        report = self.profiler.to_dict()
+        self.assertEqual([(rule["name"], rule["calls"]) for rule in report["rules"] if rule["type"] == "Entrance"],
+                         [("Door", 2)])
+        self.assertEqual(report["players"]["1"]["rule_calls"], 4)
+        self.assertEqual(report["players"]["1"]["reachability_calls"], 2)
+        self.assertEqual(report["players"]["2"]["rule_calls"], 0)
+
+    def test_write(self) -> None:
+        """Test that the report is written as json"""
+        CollectionState(self.multiworld).sweep_for_events()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "profile.json")
+            self.profiler.write(file_path)
+            with open(file_path, encoding="utf-8") as f:
+                report = json.load(f)
+        self.assertEqual(report["sweeps"]["calls"], 1)
+        self.assertEqual(report["seed"], self.multiworld.seed_name)
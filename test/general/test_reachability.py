@@ -1,8 +1,9 @@
 import unittest
 
-from BaseClasses import CollectionState
-from worlds.AutoWorld import AutoWorldRegister
-from . import setup_solo_multiworld
+from BaseClasses import CollectionState, Item, ItemClassification, LocationProgressType, Region
+from Fill import swap_location_item
+from worlds.AutoWorld import AutoWorldRegister, call_all, call_single
+from . import generate_items, generate_locations, generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -69,3 +70,172 @@ class TestBase(unittest.TestCase):
                             locations.add(location)
                     self.assertGreater(len(locations), 0,
                                        msg="Need to be able to reach at least one location to get started.")
+
+
+class TestIncrementalReachability(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.items = generate_items(3, 1, True)
+        key_a, key_b, key_c = (item.name for item in self.items)
+        menu = self.multiworld.get_region("Menu", 1)
+        regions = [Region(name, 1, self.multiworld) for name in ("A", "B", "C", "D")]
+        self.multiworld.regions += regions
+        region_a, region_b, region_c, region_d = regions
+        menu.connect(region_a, "To A", lambda state: state.has(key_a, 1)).item_dependencies = {key_a}
+        region_a.connect(region_b, "To B", lambda state: state.has_all((key_a, key_b), 1)).item_dependencies = \
+            {key_a, key_b}
+        menu.connect(region_c, "To C", lambda state: state.has(key_c, 1))  # undeclared dependencies
+        region_c.connect(region_d, "To D", lambda state: state.can_reach("B", "Region", 1)).item_dependencies = set()
+        self.multiworld.register_indirect_condition(region_b, self.multiworld.get_entrance("To D", 1))
+
+    def assert_same_reachability(self, state: CollectionState) -> None:
+        self.multiworld.worlds[1].incremental_reachability = False
+        reference = CollectionState(self.multiworld)
+        for item in self.items:
+            if state.has(item.name, 1):
+                reference.collect(item, True)
+        reference.update_reachable_regions(1)
+        self.multiworld.worlds[1].incremental_reachability = True
+        state.update_reachable_regions(1)
+        self.assertEqual(state.reachable_regions[1], reference.reachable_regions[1])
+
+    def test_collect_matches_full_search(self) -> None:
+        """Test that incrementally updating the reachable regions gives the same result as a full search"""
+        for order in ((0, 1, 2), (1, 0, 2), (2, 1, 0), (1, 2, 0)):
+            with self.subTest(order=order):
+                self.multiworld.worlds[1].incremental_reachability = True
+                state = CollectionState(self.multiworld)
+                self.assert_same_reachability(state)
+                for index in order:
+                    state.collect(self.items[index], True)
+                    self.assert_same_reachability(state)
+
+    def test_remove_matches_full_search(self) -> None:
+        """Test that removing items with incremental reachability gives the same result as a full search"""
+        self.multiworld.worlds[1].incremental_reachability = True
+        state = CollectionState(self.multiworld)
+        for item in self.items:
+            state.collect(item, True)
+        self.assert_same_reachability(state)
+        for item in self.items:
+            state.remove(item)
+            self.assert_same_reachability(state)
+
+    def test_stale_from_indirect_condition(self) -> None:
+        """Test that a player marked stale for something other than collected items gets a full search"""
+        region_e = Region("E", 1, self.multiworld)
+        self.multiworld.regions.append(region_e)
+        # an indirect condition without registering it, so the world has to mark the player stale instead
+        self.multiworld.get_region("Menu", 1).connect(
+            region_e, "To E", lambda state: state.can_reach("B", "Region", 1)).item_dependencies = set()
+        reachable = []
+        for incremental in (False, True):
+            self.multiworld.worlds[1].incremental_reachability = incremental
+            state = CollectionState(self.multiworld)
+            state.collect(self.items[0], True)
+            state.collect(self.items[1], True)
+            state.update_reachable_regions(1)
+            self.assertNotIn(region_e, state.reachable_regions[1])
+            state.stale[1] = True
+            state.collect(self.items[2], True)
+            state.update_reachable_regions(1)
+            reachable.append(state.reachable_regions[1])
+        self.assertIn(region_e, reachable[0])
+        self.assertEqual(reachable[1], reachable[0])
+
+
+class TestPlaythrough(unittest.TestCase):
+    def test_playthrough_keeps_required_items(self) -> None:
+        """Test that the playthrough keeps every copy of a required item and culls everything else"""
+        multiworld = generate_test_multiworld()
+        items = generate_items(3, 1, True)
+        key = items[0]
+        items.insert(1, Item(key.name, ItemClassification.progression, None, 1))
+        menu = multiworld.get_region("Menu", 1)
+        goal = Region("Goal", 1, multiworld)
+        multiworld.regions.append(goal)
+        menu.connect(goal, "To Goal", lambda state: state.has(key.name, 1, 2))
+        locations = generate_locations(3, 1, menu) + generate_locations(1, 1, goal, tag="_goal")
+        for location, item in zip(locations, items):
+            multiworld.push_item(location, item, False)
+        multiworld.completion_condition[1] = lambda state: state.has(items[3].name, 1)
+
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        self.assertEqual(sorted(multiworld.spoiler.playthrough["1"]), sorted(map(str, locations[:2])))
+        self.assertEqual(list(multiworld.spoiler.playthrough["2"]), [str(locations[3])])
+        self.assertEqual(len(multiworld.spoiler.playthrough), 3)
+        self.assertEqual([location.item for location in locations], items)
+
+
+class TestSphereIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.items = generate_items(2, 1, True) + generate_items(1, 1, False)
+        menu = self.multiworld.get_region("Menu", 1)
+        goal = Region("Goal", 1, self.multiworld)
+        self.multiworld.regions.append(goal)
+        menu.connect(goal, "To Goal", lambda state: state.has(self.items[0].name, 1))
+        self.locations = generate_locations(2, 1, menu) + generate_locations(1, 1, goal, tag="_goal")
+        for location, item in zip(self.locations, self.items):
+            self.multiworld.push_item(location, item, False)
+        self.multiworld.completion_condition[1] = lambda state: state.has(self.items[1].name, 1)
+
+    def test_spheres_are_cached(self) -> None:
+        """Test that sweeping the multiworld for spheres only happens once until items get moved"""
+        spheres = list(self.multiworld.get_spheres())
+        self.assertEqual(spheres, [set(self.locations[:2]), {self.locations[2]}])
+        self.assertIs(self.multiworld.get_sphere_index(), self.multiworld.get_sphere_index())
+        self.assertTrue(self.multiworld.fulfills_accessibility())
+        self.assertTrue(self.multiworld.can_beat_game())
+
+        swap_location_item(self.locations[0], self.locations[2])
+        spheres = list(self.multiworld.get_spheres())
+        self.assertEqual(spheres, [set(self.locations[:2]), set(), {self.locations[2]}])
+        self.assertFalse(self.multiworld.fulfills_accessibility())
+        self.assertTrue(self.multiworld.can_beat_game())
+
+        self.multiworld.push_item(self.locations[1], self.items[2], False)
+        self.assertFalse(self.multiworld.can_beat_game())
+
+    def test_place_locked_item(self) -> None:
+        """Test that placing a locked item drops the cached spheres"""
+        self.assertTrue(self.multiworld.can_beat_game())
+        location = generate_locations(1, 1, self.multiworld.get_region("Menu", 1), tag="_locked")[0]
+        location.place_locked_item(Item(self.items[1].name, ItemClassification.progression, None, 1))
+        self.assertEqual(list(self.multiworld.get_spheres())[0], {*self.locations[:2], location})
+
+    def test_world_stages(self) -> None:
+        """Test that world stages drop the cached spheres, unless they only produce output"""
+        sphere_index = self.multiworld.get_sphere_index()
+        call_single(self.multiworld, "generate_output", 1, "")
+        self.assertIs(self.multiworld.get_sphere_index(), sphere_index)
+        call_all(self.multiworld, "post_fill")
+        self.assertIsNot(self.multiworld.get_sphere_index(), sphere_index)
+
+    def test_accessibility_ignores_excluded_locations(self) -> None:
+        """Test that progression in excluded locations doesn't count for the accessibility check"""
+        swap_location_item(self.locations[1], self.locations[2])
+        self.assertTrue(self.multiworld.fulfills_accessibility())
+        self.locations[0].progress_type = LocationProgressType.EXCLUDED
+        self.assertFalse(self.multiworld.fulfills_accessibility())
+        self.assertEqual(len(self.multiworld.get_sphere_index().spheres), 2)
+
+    def test_spheres_count_every_item(self) -> None:
+        """Test that get_spheres keeps counting items of every classification, unlike the sweep of the sphere index"""
+        swap_location_item(self.locations[0], self.locations[2])
+        self.multiworld.get_entrance("To Goal", 1).access_rule = lambda state: state.has(self.items[2].name, 1)
+        self.assertEqual(list(self.multiworld.get_spheres()), [set(self.locations[:2]), {self.locations[2]}])
+        self.assertEqual(self.multiworld.get_sphere_index().spheres, [set(self.locations[:2]), set(),
+                                                                      {self.locations[2]}])
+
+    def test_shared_states_stay_untouched(self) -> None:
+        """Test that checks reading the sphere index only update copies of its states"""
+        swap_location_item(self.locations[1], self.locations[2])
+        self.multiworld.completion_condition[1] = lambda state: state.can_reach("Goal", "Region", 1) and \
+            state.has(self.items[1].name, 1)
+        states = self.multiworld.get_sphere_index().states
+        stale = [dict(state.stale) for state in states]
+        self.assertTrue(self.multiworld.can_beat_game())
+        self.assertTrue(self.multiworld.fulfills_accessibility())
+        self.multiworld.spoiler.create_playthrough(create_paths=False)
+        self.assertEqual([state.stale for state in states], stale)
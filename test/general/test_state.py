@@ -0,0 +1,92 @@
+import unittest
+
+from BaseClasses import CollectionState, Region
+from . import generate_items, generate_test_multiworld
+
+
+class TestCollectionStateCopy(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.items = generate_items(2, 1, True) + generate_items(2, 2, True)
+        for player in (1, 2):
+            region = Region("Goal", player, self.multiworld)
+            self.multiworld.regions.append(region)
+            key = self.items[(player - 1) * 2].name
+            self.multiworld.get_region("Menu", player).connect(region, f"To Goal {player}",
+                                                               lambda state, k=key, p=player: state.has(k, p))
+        self.state = CollectionState(self.multiworld)
+
+    def test_collect_after_copy(self) -> None:
+        """Test that collecting into a copy or its original does not affect the other one"""
+        self.state.collect(self.items[1], True)
+        copied = self.state.copy()
+        copied.collect(self.items[0], True)
+        self.state.collect(self.items[2], True)
+
+        self.assertTrue(copied.has(self.items[0].name, 1))
+        self.assertFalse(self.state.has(self.items[0].name, 1))
+        self.assertTrue(self.state.has(self.items[2].name, 2))
+        self.assertFalse(copied.has(self.items[2].name, 2))
+        self.assertTrue(self.state.has(self.items[1].name, 1) and copied.has(self.items[1].name, 1))
+
+        self.assertTrue(copied.can_reach("Goal", "Region", 1))
+        self.assertFalse(self.state.can_reach("Goal", "Region", 1))
+        self.assertTrue(self.state.can_reach("Goal", "Region", 2))
+        self.assertFalse(copied.can_reach("Goal", "Region", 2))
+
+    def test_direct_write_after_copy(self) -> None:
+        """Test that writing to prog_items of a copy directly does not affect the original"""
+        self.assertFalse(self.state.can_reach("Goal", "Region", 1))
+        copied = self.state.copy()
+        copied.prog_items[1][self.items[0].name] += 1
+        copied.stale[1] = True
+
+        self.assertTrue(copied.can_reach("Goal", "Region", 1))
+        self.assertFalse(self.state.has(self.items[0].name, 1))
+        self.assertFalse(self.state.can_reach("Goal", "Region", 1))
+
+    def test_remove_after_copy(self) -> None:
+        """Test that removing from a copy does not affect the original"""
+        self.state.collect(self.items[0], True)
+        copied = self.state.copy()
+        copied.remove(self.items[0])
+
+        self.assertTrue(self.state.can_reach("Goal", "Region", 1))
+        self.assertFalse(copied.can_reach("Goal", "Region", 1))
+
+    def test_container_kept_across_copy(self) -> None:
+        """Test that a container kept across copy() is shared with the copy, until it is taken through [] again"""
+        name = self.items[0].name
+        prog_items = self.state.prog_items[1]
+        copied = self.state.copy()
+        prog_items[name] += 1  # breaks the rule documented on CopyOnWriteDict
+        self.assertTrue(copied.has(name, 1))
+
+        self.state.prog_items[1][name] += 1
+        self.assertEqual(self.state.count(name, 1), 2)
+        self.assertEqual(copied.count(name, 1), 1)
+
+    def test_copy_leaves_source_untouched(self) -> None:
+        """Test that copying does not replace the containers of the original or forget which ones it owns"""
+        self.state.collect(self.items[0], True)
+        prog_items = self.state.prog_items
+        containers = {player: prog_items.get(player) for player in prog_items}
+        owned = dict(prog_items.owned)
+        self.state.copy()
+
+        self.assertEqual(prog_items.owned, owned)
+        for player, container in containers.items():
+            self.assertIs(prog_items.get(player), container)
+
+
+class TestCollectionStateRemove(unittest.TestCase):
+    def test_remove_undoes_collect(self) -> None:
+        """Test that removing items with the same event flag they were collected with restores the previous state"""
+        multiworld = generate_test_multiworld()
+        items = generate_items(2, 1, True) + generate_items(2, 1, False)
+        state = CollectionState(multiworld)
+        for item in items:
+            state.collect(item, True)
+        for item in items:
+            self.assertTrue(state.remove(item, True))
+        self.assertEqual(state.prog_items[1], CollectionState(multiworld).prog_items[1])
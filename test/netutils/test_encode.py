@@ -0,0 +1,55 @@
+# Tests for NetUtils.encode
+import unittest
+
+from NetUtils import ClientStatus, Hint, NetworkItem, NetworkPlayer, _encode, _scan_for_TypedTuples, decode, \
+    decode_packed_items, encode, encode_packed_items
+from Utils import Version
+
+
+class TestEncode(unittest.TestCase):
+    messages = [
+        [{"cmd": "ReceivedItems", "index": 0, "items": [NetworkItem(1, 2, 3, 4), NetworkItem(5, 6, 7, 0)]}],
+        [{"cmd": "RoomInfo", "version": Version(0, 5, 0), "tags": ["AP"], "games": {"A Game"}, "time": 1.5}],
+        [{"cmd": "Connected", "players": [NetworkPlayer(0, 1, "alias", "name")], "missing_locations": {5, 6},
+          "slot_data": {1: None, "nested": [(1, 2), {"ü": "ß"}]}, "status": ClientStatus.CLIENT_GOAL}],
+        [Hint(1, 2, 3, 4, False, "entrance", 1)],
+    ]
+
+    def test_same_as_json(self) -> None:
+        """Test that encoding gives the same result as scanning for NamedTuples and encoding with json"""
+        for msgs in self.messages:
+            with self.subTest(msgs=msgs):
+                self.assertEqual(encode(msgs), _encode(_scan_for_TypedTuples(msgs)))
+
+    def test_round_trip(self) -> None:
+        """Test that NamedTuples the client knows survive encoding and decoding"""
+        self.assertEqual(decode(encode(self.messages[0]))[0]["items"], self.messages[0][0]["items"])
+
+    def test_floats(self) -> None:
+        """Test that floats decode to the same numbers as with json, and non-finite floats become null"""
+        floats = [1.5, 0.1, -0.0, 1e16, 1e-7, 2.5e300, 5e-324, 123456789.123456789]
+        self.assertEqual(decode(encode({"floats": floats})), decode(_encode({"floats": floats})))
+        self.assertEqual(decode(encode({"time": 1.5})), {"time": 1.5})
+        self.assertEqual(encode([float("nan"), float("inf"), -float("inf")]), "[null,null,null]")
+
+    def test_non_str_keys(self) -> None:
+        """Test that int, enum, bool, None and float keys encode the same as with json"""
+        data = {1: "int", 2 ** 70: "big int", ClientStatus.CLIENT_GOAL: "enum", False: "bool", None: "None",
+                1.5: "float", "nested": {3: [4], -5: {6: 7}}}
+        self.assertEqual(encode(data), _encode(data))
+
+    def test_big_int(self) -> None:
+        """Test that integers too big for 64 bit still encode"""
+        self.assertEqual(decode(encode({"value": 2 ** 70})), {"value": 2 ** 70})
+
+
+class TestPackedItems(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        """Test that packed item packets decode to the packets they stand for"""
+        items = [NetworkItem(2 ** 53 - 1, -2 ** 53, 3, 0b111), NetworkItem(5, 6, 7, 0)]
+        self.assertEqual(decode_packed_items(encode_packed_items("ReceivedItems", items, 12)),
+                         [{"cmd": "ReceivedItems", "index": 12, "items": items}])
+        self.assertEqual(decode_packed_items(encode_packed_items("LocationInfo", items)),
+                         [{"cmd": "LocationInfo", "locations": items}])
+        self.assertEqual(decode_packed_items(encode_packed_items("ReceivedItems", [])),
+                         [{"cmd": "ReceivedItems", "index": 0, "items": []}])
@@ -72,6 +72,27 @@ class TestGenerateMain(unittest.TestCase):
 
         self.assertOutput(self.output_tempdir.name)
 
+    def test_post_fill_reclassification(self):
+        """Test that the accessibility check sees items reclassified in post_fill after sweeping for spheres"""
+        from BaseClasses import ItemClassification
+        from worlds.timespinner import TimespinnerWorld
+
+        def post_fill(world: TimespinnerWorld) -> None:
+            list(world.multiworld.get_spheres())
+            for item in world.multiworld.get_items():
+                if item.player == world.player and item.advancement:
+                    item.classification = ItemClassification.useful
+
+        sys.argv = [sys.argv[0], '--seed', '0',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name]
+        TimespinnerWorld.post_fill = post_fill
+        try:
+            with self.assertRaisesRegex(Exception, "unbeatable"):
+                Main.main(*Generate.main())
+        finally:
+            del TimespinnerWorld.post_fill
+
     def test_generate_yaml(self):
         # override host.yaml
         from settings import get_settings
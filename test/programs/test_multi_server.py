@@ -1,5 +1,14 @@
+import asyncio
+import os
+import tempfile
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+
+from websockets.frames import Frame, Opcode
+
+from MultiServer import Client, Context, SaveJournal, ServerCommandProcessor, get_checked_checks, \
+    get_compression_options, get_missing_checks, get_remaining, register_location_checks, send_items_to, send_new_items
+from NetUtils import ClientStatus, Hint, LocationStore, NetworkItem, NetworkSlot, SlotType, decode, decode_packed_items
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +47,257 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.save_filename = os.path.join(self.temp_dir.name, "test.apsave")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def make_context(self) -> Context:
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.save_filename = self.save_filename
+        ctx.save_journal = SaveJournal(self.save_filename + ".journal")
+        return ctx
+
+    def load_context(self) -> Context:
+        ctx = self.make_context()
+        ctx._load_save()
+        return ctx
+
+    def assert_same_save(self, ctx: Context, loaded: Context) -> None:
+        saved, loaded_save = ctx.get_save(), loaded.get_save()
+        for section in ("journal_generation", "client_activity_timers", "client_connection_timers"):
+            saved.pop(section, None)
+            loaded_save.pop(section, None)
+        self.assertEqual(saved, loaded_save)
+
+    def test_replay_journal(self) -> None:
+        """Test that changes after a snapshot are appended to the journal and replayed when loading"""
+        ctx = self.make_context()
+        ctx.location_checks[0, 1] |= {1, 2}
+        ctx.received_items[0, 1, True] = [NetworkItem(1, 1, 1, 0)]
+        ctx._save()
+        snapshot = os.path.getsize(self.save_filename)
+        journal = os.path.getsize(ctx.save_journal.file_path)
+
+        ctx.location_checks[0, 1] |= {3}
+        ctx.location_checks[0, 2] |= {1}
+        ctx.received_items[0, 1, True].append(NetworkItem(2, 3, 2, 0))
+        ctx.hints[0, 1].add(Hint(1, 2, 5, 6, False))
+        ctx.stored_data["key"] = [1, 2]
+        ctx.stored_data_changed.add("key")
+        ctx.client_game_state[0, 1] = ClientStatus.CLIENT_GOAL
+        ctx._save()
+        self.assertEqual(os.path.getsize(self.save_filename), snapshot)
+        self.assertGreater(os.path.getsize(ctx.save_journal.file_path), journal)
+
+        loaded = self.load_context()
+        self.assert_same_save(ctx, loaded)
+        self.assertEqual(loaded.received_items[0, 1, True], ctx.received_items[0, 1, True])
+
+        # saving without changes appends nothing
+        journal = os.path.getsize(ctx.save_journal.file_path)
+        ctx._save()
+        self.assertEqual(os.path.getsize(ctx.save_journal.file_path), journal)
+
+    def test_interrupted_write(self) -> None:
+        """Test that a partially written last frame of the journal is dropped and the journal stays appendable"""
+        ctx = self.make_context()
+        ctx._save()
+        ctx.location_checks[0, 1] |= {1}
+        ctx._save()
+        with open(ctx.save_journal.file_path, "ab") as f:
+            f.write(b"\xff\x00\x00\x00broken")
+
+        loaded = self.load_context()
+        self.assert_same_save(ctx, loaded)
+        loaded.location_checks[0, 1] |= {2}
+        loaded._save()
+        self.assertEqual(self.load_context().location_checks[0, 1], {1, 2})
+
+    def test_compaction(self) -> None:
+        """Test that a new snapshot replaces the journal once it outgrows the last snapshot"""
+        ctx = self.make_context()
+        ctx.save_journal.compaction_size = 0
+        ctx._save()
+        generation = ctx.save_journal.generation
+        for location in range(100):
+            ctx.location_checks[0, 1] |= {location}
+            ctx._save()
+        self.assertNotEqual(ctx.save_journal.generation, generation)
+        self.assert_same_save(ctx, self.load_context())
+
+    def test_stale_journal_ignored(self) -> None:
+        """Test that a journal left over from an older snapshot is not replayed"""
+        ctx = self.make_context()
+        ctx._save()
+        ctx.location_checks[0, 1] |= {1}
+        ctx._save()
+        with open(ctx.save_journal.file_path, "rb") as f:
+            old_journal = f.read()
+        ctx.save_journal.invalidate()
+        ctx.location_checks[0, 1].clear()
+        ctx._save()
+        with open(ctx.save_journal.file_path, "wb") as f:
+            f.write(old_journal)
+
+        self.assertEqual(self.load_context().location_checks[0, 1], set())
+
+
+class TestRecheckHints(unittest.TestCase):
+    def test_update_found(self) -> None:
+        """Test that checking locations only updates the hint sets holding hints for them"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        hint = Hint(2, 1, 5, 6, False)
+        other_hint = Hint(3, 1, 7, 8, False)
+        ctx.add_hints(0, 1, (hint, other_hint))
+        ctx.add_hints(0, 2, (hint,))
+        ctx.add_hints(0, 3, (other_hint,))
+
+        ctx.location_checks[0, 1] |= {5}
+        self.assertEqual(ctx.update_found_hints(0, 1, {5}), {(0, 1), (0, 2)})
+        self.assertEqual(ctx.hints[0, 1], {hint._replace(found=True), other_hint})
+        self.assertEqual(ctx.hints[0, 2], {hint._replace(found=True)})
+        self.assertEqual(ctx.hints[0, 3], {other_hint})
+        self.assertEqual(ctx.update_found_hints(0, 1, {5}), set())
+
+    def test_recheck_loaded(self) -> None:
+        """Test that rechecking without a slot only updates the hint sets loaded from a save"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        hint = Hint(2, 1, 5, 6, False)
+        ctx.hints[0, 1] = {hint}
+        ctx.hints[0, 2] = {hint}
+        ctx.dirty_hints.add((0, 1))
+
+        ctx.location_checks[0, 1] |= {5}
+        ctx.recheck_hints()
+        self.assertEqual(ctx.hints[0, 1], {hint._replace(found=True)})
+        self.assertEqual(ctx.hints[0, 2], {hint})
+        self.assertFalse(ctx.dirty_hints)
+        self.assertEqual(ctx.get_rechecked_hints(0, 2), {hint._replace(found=True)})
+
+    def test_item_locations(self) -> None:
+        """Test that placements of an item are looked up by receiving slot"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.locations = LocationStore({1: {10: (100, 2, 1), 11: (100, 1, 0)}, 2: {20: (100, 2, 0)}})
+        self.assertEqual(sorted(ctx.get_item_locations(2, 100)), [(1, 10, 1), (2, 20, 0)])
+        self.assertEqual(ctx.get_item_locations(1, 100), [(1, 11, 0)])
+        self.assertEqual(ctx.get_item_locations(1, 101), [])
+
+
+class TestSlotLocations(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.ctx.locations = LocationStore({1: {12: (100, 2, 0), 10: (102, 1, 1), 11: (101, 2, 0)}, 2: {}})
+        self.ctx.player_names = {(0, 1): "Player1", (0, 2): "Player2"}
+        self.ctx.slot_info = {slot: NetworkSlot(f"Player{slot}", "Archipelago", SlotType.player) for slot in (1, 2)}
+        self.ctx.clients = {0: {1: [], 2: []}}
+
+    async def test_kept_in_sync(self) -> None:
+        """Test that missing, checked and remaining are cached and follow newly checked locations"""
+        slot_locations = self.ctx.get_slot_locations(0, 1)
+        self.assertEqual(slot_locations.missing, [10, 11, 12])
+        self.assertEqual(slot_locations.checked, [])
+        self.assertEqual(slot_locations.remaining, [100, 101, 102])
+        self.assertIs(self.ctx.get_slot_locations(0, 1), slot_locations)
+
+        register_location_checks(self.ctx, 0, 1, [11])
+        self.assertEqual(get_missing_checks(self.ctx, 0, 1), [10, 12])
+        self.assertEqual(get_checked_checks(self.ctx, 0, 1), [11])
+        self.assertEqual(get_remaining(self.ctx, 0, 1), [100, 102])
+
+    def test_location_items(self) -> None:
+        """Test that the scouted NetworkItems are built once per slot"""
+        location_items = self.ctx.get_location_items(1)
+        self.assertEqual(location_items[10], NetworkItem(102, 10, 1, 1))
+        self.assertIs(self.ctx.get_location_items(1), location_items)
+
+
+class RecordingSocket:
+    open = True
+
+    def __init__(self) -> None:
+        self.sent: typing.List[str] = []
+
+    async def send(self, msg: str) -> None:
+        self.sent.append(msg)
+
+
+class TestSendNewItems(unittest.IsolatedAsyncioTestCase):
+    async def test_only_receiving_slots(self) -> None:
+        """Test that new items are sent once, and only to the clients of slots that received them"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        clients = {}
+        for slot in (1, 2):
+            clients[slot] = Client(RecordingSocket(), ctx)
+            clients[slot].team, clients[slot].slot = 0, slot
+            clients[slot].items_handling = 0b111
+        ctx.clients = {0: {slot: [client] for slot, client in clients.items()}}
+
+        send_items_to(ctx, 0, 1, NetworkItem(1, 1, 2, 0), NetworkItem(2, 2, 2, 0))
+        send_new_items(ctx)
+        send_new_items(ctx)
+        await asyncio.sleep(0)
+        self.assertEqual(len(clients[1].socket.sent), 1)
+        self.assertIn("ReceivedItems", clients[1].socket.sent[0])
+        self.assertEqual(clients[1].send_index, 2)
+        self.assertEqual(clients[2].socket.sent, [])
+
+    async def test_packed_items(self) -> None:
+        """Test that clients with the PackedItems tag get new items as a binary message"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        client = Client(RecordingSocket(), ctx)
+        client.team, client.slot, client.items_handling, client.tags = 0, 1, 0b111, ["AP", "PackedItems"]
+        ctx.clients = {0: {1: [client]}}
+
+        send_items_to(ctx, 0, 1, NetworkItem(1, 1, 2, 0), NetworkItem(2, 2, 2, 1))
+        send_new_items(ctx)
+        await asyncio.sleep(0)
+        self.assertEqual(len(client.socket.sent), 1)
+        self.assertEqual(decode_packed_items(client.socket.sent[0]), [{
+            "cmd": "ReceivedItems", "index": 0, "items": [NetworkItem(1, 1, 2, 0), NetworkItem(2, 2, 2, 1)]}])
+
+
+class TestGetSphere(unittest.TestCase):
+    def test_get_sphere(self) -> None:
+        """Test that spheres are looked up by player and location"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        self.assertEqual(ctx.get_sphere(1, 10), -1)
+        ctx.spheres = [{1: {10, 11}}, {1: {12}, 2: {10}}]
+        self.assertEqual(ctx.get_sphere(1, 10), 0)
+        self.assertEqual(ctx.get_sphere(1, 12), 1)
+        self.assertEqual(ctx.get_sphere(2, 10), 1)
+        with self.assertRaises(KeyError):
+            ctx.get_sphere(2, 11)
+        with self.assertRaises(KeyError):
+            ctx.get_sphere(3, 10)
+
+
+class TestCompression(unittest.TestCase):
+    def test_threshold(self) -> None:
+        """Test that only messages of at least the threshold get compressed"""
+        factory, = get_compression_options("deflate", 100, 9)["extensions"]
+        _, extension = factory.process_request_params([], [])
+        small = Frame(Opcode.TEXT, b"x" * 99)
+        self.assertIs(extension.encode(small), small)
+        big = extension.encode(Frame(Opcode.TEXT, b"x" * 100))
+        self.assertTrue(big.rsv1)
+        self.assertLess(len(big.data), 100)
+
+    def test_off(self) -> None:
+        """Test that compression can be turned off and unknown policies are refused"""
+        self.assertEqual(get_compression_options("off"), {"compression": None})
+        with self.assertRaises(ValueError):
+            get_compression_options("brotli")
+
+    def test_data_package_msg(self) -> None:
+        """Test that data package messages are encoded once per set of games"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.gamespackage = {"A": {"checksum": "a"}, "B": {"checksum": "b"}}
+        msg = ctx.get_data_package_msg(frozenset(("A",)))
+        self.assertIs(ctx.get_data_package_msg(frozenset(("A",))), msg)
+        self.assertEqual(decode(msg), [{"cmd": "DataPackage", "data": {"games": {"A": {"checksum": "a"}}}}])
@@ -0,0 +1,27 @@
+import typing
+import unittest
+
+if typing.TYPE_CHECKING:
+    from flask import Flask
+
+
+class TestBase(unittest.TestCase):
+    app: typing.ClassVar[typing.Optional["Flask"]] = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # the app can only be set up once per process, so it is shared between all webhost tests
+        if TestBase.app is None:
+            from WebHostLib import app as raw_app
+            from WebHost import get_app
+            raw_app.config["PONY"] = {
+                "provider": "sqlite",
+                "filename": ":memory:",
+                "create_db": True,
+            }
+            raw_app.config.update({
+                "TESTING": True,
+            })
+            TestBase.app = get_app()
+
+        cls.client = TestBase.app.test_client()
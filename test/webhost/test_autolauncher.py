@@ -0,0 +1,96 @@
+import datetime
+import multiprocessing
+import pickle
+import time
+import uuid
+import zlib
+
+from . import TestBase
+
+
+class TestRoomScheduler(TestBase):
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib import app
+        from WebHostLib.autolauncher import MultiworldInstance, RoomScheduler
+        from WebHostLib.models import Room, Seed
+
+        self.hosters = [MultiworldInstance(app.config, x) for x in range(2)]  # not started
+        self.scheduler = RoomScheduler(self.hosters)
+        now = datetime.datetime.utcnow()
+        with db_session:
+            seed = Seed(multidata=b"\x03" + zlib.compress(pickle.dumps({})), owner=uuid.uuid4())
+            self.active_rooms = [Room(seed=seed, owner=seed.owner).id for _ in range(2)]
+            self.old_room = Room(seed=seed, owner=seed.owner, last_activity=now - datetime.timedelta(days=1)).id
+
+    def hosted(self, room_id: uuid.UUID) -> int:
+        return sum(room_id in hoster.room_ids for hoster in self.hosters)
+
+    def set_last_activity(self, room_id: uuid.UUID, last_activity: datetime.datetime) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+
+        with db_session:
+            Room.get(id=room_id).last_activity = last_activity
+
+    def test_start_active_rooms(self) -> None:
+        """Test that rooms within their timeout are started once, on the least loaded hoster"""
+        self.scheduler.poll()
+        self.scheduler.poll()
+        for room_id in self.active_rooms:
+            self.assertEqual(self.hosted(room_id), 1)
+        self.assertEqual(self.hosted(self.old_room), 0)
+        room_counts = [len(hoster.room_ids) for hoster in self.hosters]
+        self.assertLessEqual(max(room_counts) - min(room_counts), 1)
+        self.assertNotIn(self.old_room, self.scheduler.room_timeouts)
+
+        self.set_last_activity(self.old_room, datetime.datetime.utcnow())
+        self.scheduler.poll()
+        self.assertEqual(self.hosted(self.old_room), 1)
+
+    def test_skip_crashed_hosters(self) -> None:
+        """Test that new rooms are not placed on a hoster that crashed"""
+        crashed_hoster = self.hosters[0]
+        crashed_hoster.process = multiprocessing.Process(target=time.sleep, args=(0,))
+        crashed_hoster.process.start()
+        crashed_hoster.process.join()
+        self.scheduler.poll()
+        for room_id in self.active_rooms:
+            self.assertIs(self.scheduler.room_hosters[room_id], self.hosters[1])
+        self.assertFalse(crashed_hoster.room_ids)
+
+    def test_shut_down_rooms(self) -> None:
+        """Test that shut down rooms are only started again if they had activity since"""
+        self.scheduler.poll()
+        timed_out_room, visited_room = self.active_rooms
+        self.set_last_activity(timed_out_room, datetime.datetime.utcnow() - datetime.timedelta(days=1))
+        for room_id in self.active_rooms:
+            self.scheduler.room_hosters[room_id].rooms_shutting_down.put(room_id)
+        while any(self.scheduler.room_hosters[room_id].rooms_shutting_down.empty() for room_id in self.active_rooms):
+            time.sleep(0.01)  # multiprocessing queues are filled in the background
+        self.scheduler.poll()
+        self.assertEqual(self.hosted(timed_out_room), 0)
+        self.assertNotIn(timed_out_room, self.scheduler.room_hosters)
+        self.assertEqual(self.hosted(visited_room), 1)
+
+    def test_timed_out_rooms(self) -> None:
+        """Test that timed out rooms are forgotten and dropped from hosters that stopped without reporting them"""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+
+        room_id = self.active_rooms[0]
+        with db_session:
+            Room.get(id=room_id).timeout = 1
+        self.scheduler.timeout_buffer = datetime.timedelta()
+        self.scheduler.poll()
+        hoster = self.scheduler.room_hosters[room_id]
+        self.assertIn(room_id, self.scheduler.room_timeouts)
+
+        hoster.process = multiprocessing.Process(target=time.sleep, args=(0,))  # a hoster that crashed
+        hoster.process.start()
+        hoster.process.join()
+        time.sleep(1.1)
+        self.scheduler.poll()
+        self.assertNotIn(room_id, self.scheduler.room_timeouts)
+        self.assertNotIn(room_id, self.scheduler.room_hosters)
+        self.assertEqual(self.hosted(room_id), 0)
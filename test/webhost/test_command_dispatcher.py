@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import pickle
+import uuid
+import zlib
+
+from . import TestBase
+
+
+class TestCommandDispatcher(TestBase):
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Command, Room, Seed
+
+        with db_session:
+            seed = Seed(multidata=b"\x03" + zlib.compress(pickle.dumps({})), owner=uuid.uuid4())
+            self.hosted_room, self.other_room = (Room(seed=seed, owner=seed.owner).id for _ in range(2))
+            for room_id in (self.hosted_room, self.other_room):
+                Command(room=Room.get(id=room_id), commandtext="/nonexistent")
+
+    def remaining_commands(self, room_id: uuid.UUID) -> int:
+        from pony.orm import count, db_session
+        from WebHostLib.models import Command
+
+        with db_session:
+            return count(command for command in Command if command.room.id == room_id)
+
+    def test_dispatch(self) -> None:
+        """Test that commands are run on the room's event loop and only taken for rooms that are hosted"""
+        from pony.orm import db_session
+        from WebHostLib.customserver import CommandDispatcher, StaticServerData, WebHostContext
+        from WebHostLib.models import Command, Room
+
+        async def dispatch() -> None:
+            ctx = WebHostContext(StaticServerData("", {}), logging.getLogger("CommandDispatcherTest"))
+            ctx.room_id = self.hosted_room
+            dispatcher = CommandDispatcher()  # dispatching manually instead of starting the thread
+            dispatcher.add_room(ctx)
+            with self.assertLogs("CommandDispatcherTest") as logs:
+                dispatcher.dispatch()
+                await asyncio.sleep(0)
+            self.assertIn("nonexistent", logs.output[0])
+            self.assertEqual(self.remaining_commands(self.hosted_room), 0)
+            self.assertEqual(self.remaining_commands(self.other_room), 1)
+
+            ctx.exit_event.set()  # room shut down, its commands are left for its next host
+            with db_session:
+                Command(room=Room.get(id=self.hosted_room), commandtext="/nonexistent")
+            dispatcher.dispatch()
+            self.assertEqual(self.remaining_commands(self.hosted_room), 1)
+
+        asyncio.run(dispatch())
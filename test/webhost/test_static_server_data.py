@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+import pickle
+import tempfile
+import uuid
+import zlib
+
+from NetUtils import NetworkSlot, SlotType
+
+from . import TestBase
+
+
+class TestStaticServerData(TestBase):
+    data = {
+        "gamespackage": {
+            "Archipelago": {"item_name_to_id": {"Nothing": -1}, "location_name_to_id": {"Cheat Console": -1},
+                            "checksum": "archipelago"},
+            "Static Test": {"item_name_to_id": {"Sword": 100}, "location_name_to_id": {"Chest": 10},
+                            "checksum": "static_test"},
+            "Unused Test": {"item_name_to_id": {"Bow": 200}, "location_name_to_id": {"Barrel": 20},
+                            "checksum": "unused_test"},
+        },
+        "item_name_groups": {"Archipelago": {}, "Static Test": {"Weapons": {"Sword"}}, "Unused Test": {}},
+        "location_name_groups": {"Archipelago": {}, "Static Test": {}, "Unused Test": {}},
+        "non_hintable_names": {"Archipelago": frozenset(), "Static Test": frozenset({"Chest"}),
+                               "Unused Test": frozenset()},
+    }
+
+    def setUp(self) -> None:
+        from WebHostLib.customserver import StaticServerData
+
+        file_descriptor, self.file_path = tempfile.mkstemp()
+        os.close(file_descriptor)
+        # sent to hoster processes pickled
+        self.static_server_data = pickle.loads(pickle.dumps(StaticServerData.write(self.data, self.file_path)))
+
+    def tearDown(self) -> None:
+        os.remove(self.file_path)
+
+    def test_get_game(self) -> None:
+        """Test that games are read back from the file, once, and unknown games are empty"""
+        game_data = self.static_server_data.get_game("Static Test")
+        self.assertEqual(game_data, {key: self.data[key]["Static Test"] for key in self.data})
+        self.assertIs(self.static_server_data.get_game("Static Test"), game_data)
+        self.assertEqual(self.static_server_data.get_game("Unknown Test"), {})
+
+    def test_load_room(self) -> None:
+        """Test that a room only loads the games it uses"""
+        from pony.orm import db_session
+        from WebHostLib.customserver import WebHostContext
+        from WebHostLib.models import Room, Seed
+
+        multidata = {
+            "seed_name": "12345",
+            "minimum_versions": {"server": (0, 0, 0), "clients": {}},
+            "version": (0, 0, 0),
+            "slot_info": {1: NetworkSlot("Player1", "Static Test", SlotType.player)},
+            "slot_data": {1: {}},
+            "connect_names": {"Player1": (0, 1)},
+            "locations": {1: {10: (100, 1, 0)}},
+            "precollected_items": {1: []},
+            "precollected_hints": {1: set()},
+            "er_hint_data": {},
+            "datapackage": {"Static Test": {"checksum": "static_test"}},
+        }
+        with db_session:
+            seed = Seed(multidata=b"\x03" + zlib.compress(pickle.dumps(multidata)), owner=uuid.uuid4())
+            room = Room(seed=seed, owner=seed.owner, tracker=uuid.uuid4())
+
+        async def load() -> WebHostContext:
+            ctx = WebHostContext(self.static_server_data, logging.getLogger("StaticServerDataTest"))
+            ctx.load(room.id)
+            return ctx
+
+        ctx = asyncio.run(load())
+        self.assertEqual(set(ctx.gamespackage), {"Archipelago", "Static Test"})
+        self.assertEqual(set(self.static_server_data._games), {"Archipelago", "Static Test"})
+        self.assertEqual(ctx.location_names["Static Test"][10], "Chest")
+        self.assertEqual(ctx.item_name_groups["Static Test"], {"Weapons": {"Sword"}})
+        self.assertIn("Chest", ctx.non_hintable_names["Static Test"])
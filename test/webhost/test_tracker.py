@@ -0,0 +1,101 @@
+import datetime
+import pickle
+import uuid
+import zlib
+
+from NetUtils import Hint, NetworkItem, NetworkSlot, SlotType
+
+from . import TestBase
+
+
+class TestTrackerUpdates(TestBase):
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib import app
+        from WebHostLib.models import GameDataPackage, Room, Seed
+
+        multidata = {
+            "seed_name": "12345",
+            "slot_info": {1: NetworkSlot("Player1", "Tracker Test", SlotType.player)},
+            "slot_data": {1: {}},
+            "locations": {1: {10: (100, 1, 0), 11: (101, 1, 0)}},
+            "precollected_items": {1: [101]},
+            "datapackage": {"Tracker Test": {"checksum": "tracker_test"}},
+        }
+        with db_session:
+            if not GameDataPackage.get(checksum="tracker_test"):
+                GameDataPackage(checksum="tracker_test", data=pickle.dumps({
+                    "item_name_to_id": {"Sword": 100, "Shield": 101},
+                    "location_name_to_id": {"Chest": 10, "Pot": 11},
+                }))
+            seed = Seed(multidata=b"\x03" + zlib.compress(pickle.dumps(multidata)), owner=uuid.uuid4())
+            self.room = Room(seed=seed, owner=seed.owner, tracker=uuid.uuid4())
+        self.url = f"/tracker/{app.jinja_env.filters['suuid'](self.room.tracker)}/0/1"
+
+    def save(self, multisave: dict) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+
+        with db_session:
+            room = Room.get(id=self.room.id)
+            room.multisave = pickle.dumps(multisave)
+            room.last_activity = room.last_activity + datetime.timedelta(seconds=1)
+
+    def test_updates_since_cursor(self) -> None:
+        """Test that the updates feed only sends what changed since the cursor"""
+        page = self.client.get(self.url)
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(f"{self.url}/updates", page.text)
+
+        updates = self.client.get(f"{self.url}/updates").get_json()
+        self.assertEqual(set(updates), {"cursor"})
+        self.assertEqual(updates["cursor"]["items"], 0)
+
+        hint = Hint(1, 1, 11, 101, False)
+        self.save({
+            "location_checks": {(0, 1): {10}},
+            "received_items": {(0, 1, True): [NetworkItem(100, 10, 1, 0)]},
+            "hints": {(0, 1): {hint}},
+        })
+        updates = self.client.get(f"{self.url}/updates", query_string=updates["cursor"]).get_json()
+        self.assertEqual({key: updates["cursor"][key] for key in ("items", "checks", "hints")},
+                         {"items": 1, "checks": 1, "hints": 1})
+        self.assertEqual(updates["received_items"], [["Sword", 1, 1]])
+        self.assertEqual(updates["checked_locations"], ["Chest"])
+        self.assertEqual([(hint["item"], hint["location"], hint["found"]) for hint in updates["hints"]],
+                         [("Shield", "Pot", False)])
+        self.assertNotIn("replace", updates)
+        cursor = updates["cursor"]
+
+        self.save({
+            "location_checks": {(0, 1): {10, 11}},
+            "received_items": {(0, 1, True): [NetworkItem(100, 10, 1, 0), NetworkItem(100, 11, 1, 0)]},
+            "hints": {(0, 1): {hint._replace(found=True)}},
+        })
+        updates = self.client.get(f"{self.url}/updates", query_string=cursor).get_json()
+        self.assertEqual(updates["received_items"], [["Sword", 2, 2]])
+        self.assertEqual(updates["checked_locations"], ["Pot"])
+        self.assertEqual([(hint["item"], hint["location"], hint["found"]) for hint in updates["hints"]],
+                         [("Shield", "Pot", True)])
+        self.assertNotIn("replace", updates)
+
+        updates = self.client.get(f"{self.url}/updates", query_string=updates["cursor"]).get_json()
+        self.assertEqual(set(updates), {"cursor"})
+
+    def test_updates_replace(self) -> None:
+        """Test that the updates feed sends everything if the cursor is unknown or ahead of the save"""
+        self.save({
+            "location_checks": {(0, 1): {10}},
+            "received_items": {(0, 1, True): [NetworkItem(100, 10, 1, 0)]},
+            "hints": {(0, 1): {Hint(1, 1, 11, 101, False)}},
+        })
+        updates = self.client.get(f"{self.url}/updates",
+                                  query_string={"items": 2, "checks": 2, "hints": 2, "version": 1}).get_json()
+        self.assertEqual(updates["replace"], ["received_items", "checked_locations", "hints"])
+        self.assertEqual(updates["received_items"], [["Shield", 1, 0], ["Sword", 1, 1]])
+        self.assertEqual(updates["checked_locations"], ["Chest"])
+        self.assertEqual(len(updates["hints"]), 1)
+
+    def test_unknown_player(self) -> None:
+        """Test that the updates feed of a slot that does not exist is not found"""
+        self.assertEqual(self.client.get(f"{self.url[:-1]}2/updates").status_code, 404)
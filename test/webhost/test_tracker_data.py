@@ -0,0 +1,72 @@
+import datetime
+import pickle
+import uuid
+import zlib
+
+from NetUtils import NetworkSlot, SlotType
+
+from . import TestBase
+
+
+class TestTrackerData(TestBase):
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import GameDataPackage, Room, Seed
+
+        multidata = {
+            "seed_name": "12345",
+            "slot_info": {1: NetworkSlot("Player1", "Tracker Data Test", SlotType.player)},
+            "slot_data": {1: {}},
+            "locations": {1: {10: (100, 1, 0)}},
+            "precollected_items": {1: []},
+            "datapackage": {"Tracker Data Test": {"checksum": "tracker_data_test"}},
+        }
+        with db_session:
+            if not GameDataPackage.get(checksum="tracker_data_test"):
+                GameDataPackage(checksum="tracker_data_test", data=pickle.dumps({
+                    "item_name_to_id": {"Sword": 100},
+                    "location_name_to_id": {"Chest": 10, "Pot": 11},
+                }))
+            seed = Seed(multidata=b"\x03" + zlib.compress(pickle.dumps(multidata)), owner=uuid.uuid4())
+            self.room_id = Room(seed=seed, owner=seed.owner, multisave=pickle.dumps({"version": 1})).id
+
+    def test_multisave_reloaded_on_save(self) -> None:
+        """Test that the multisave is only decoded again once it changed, also by saves that aren't activity"""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import _get_multisave
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            version, multisave = _get_multisave(room)
+            self.assertEqual(multisave, {"version": 1})
+            room.last_activity = room.last_activity + datetime.timedelta(seconds=1)
+            self.assertEqual(_get_multisave(room), (version, multisave))
+            self.assertIs(_get_multisave(room)[1], multisave)
+
+            room.multisave = pickle.dumps({"version": 2})  # like the save of a room shutting down
+            self.assertEqual(_get_multisave(room)[1], {"version": 2})
+
+    def test_unknown_ids_not_stored(self) -> None:
+        """Test that looking up unknown ids doesn't add them to the lookups shared between requests"""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            tracker_data = TrackerData(Room.get(id=self.room_id))
+        item_id_to_name = tracker_data.item_id_to_name["Tracker Data Test"]
+        self.assertEqual(item_id_to_name[999], "Unknown Item (ID: 999)")
+        self.assertNotIn(999, item_id_to_name)
+
+    def test_location_name_to_id(self) -> None:
+        """Test that the name to id lookups hold the data package's tables"""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            tracker_data = TrackerData(Room.get(id=self.room_id))
+        self.assertEqual(tracker_data.location_name_to_id["Tracker Data Test"], {"Chest": 10, "Pot": 11})
+        self.assertEqual(tracker_data.item_name_to_id["Tracker Data Test"], {"Sword": 100})
+        self.assertEqual(tracker_data.location_id_to_name["Tracker Data Test"][11], "Pot")
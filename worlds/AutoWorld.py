@@ -21,6 +21,10 @@ if TYPE_CHECKING:
 perf_logger = logging.getLogger("performance")
 
 
+def _intern(name: str) -> str:
+    return sys.intern(name) if type(name) is str else name
+
+
 class AutoWorldRegister(type):
     world_types: Dict[str, Type[World]] = {}
     __file__: str
@@ -39,8 +43,8 @@ class AutoWorldRegister(type):
     def __new__(mcs, name: str, bases: Tuple[type, ...], dct: Dict[str, Any]) -> AutoWorldRegister:
         if "web" in dct:
             assert isinstance(dct["web"], WebWorld), "WebWorld has to be instantiated."
-        # filter out any events
-        dct["item_name_to_id"] = {name: id for name, id in dct["item_name_to_id"].items() if id}
+        # filter out any events, item names get interned same as Item.name
+        dct["item_name_to_id"] = {_intern(name): id for name, id in dct["item_name_to_id"].items() if id}
         dct["location_name_to_id"] = {name: id for name, id in dct["location_name_to_id"].items() if id}
         # build reverse lookups
         dct["item_id_to_name"] = {code: name for name, code in dct["item_name_to_id"].items()}
@@ -48,7 +52,7 @@ class AutoWorldRegister(type):
 
         # build rest
         dct["item_names"] = frozenset(dct["item_name_to_id"])
-        dct["item_name_groups"] = {group_name: frozenset(group_set) for group_name, group_set
+        dct["item_name_groups"] = {group_name: frozenset(map(_intern, group_set)) for group_name, group_set
                                    in dct.get("item_name_groups", {}).items()}
         dct["item_name_groups"]["Everything"] = dct["item_names"]
 
@@ -144,11 +148,18 @@ class WebWorldRegister(type):
         return super().__new__(mcs, name, bases, dct)
 
 
-def _timed_call(method: Callable[..., Any], *args: Any,
-                multiworld: Optional["MultiWorld"] = None, player: Optional[int] = None) -> Any:
+_output_stages = frozenset({"generate_output", "fill_slot_data", "extend_hint_information", "modify_multidata",
+                            "write_spoiler_header", "write_spoiler", "write_spoiler_end"})
+"""Stages that run on the final placements, and so leave the multiworld's sphere index alone."""
+
+
+def _timed_call(method: Callable[..., Any], *args: Any, multiworld: Optional["MultiWorld"] = None,
+                player: Optional[int] = None, game: Optional[str] = None) -> Any:
     start = time.perf_counter()
     ret = method(*args)
     taken = time.perf_counter() - start
+    if multiworld and multiworld.profiler:
+        multiworld.profiler.add_stage(method.__name__, player, game, taken)
     if taken > 1.0:
         if player and multiworld:
             perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__} for player {player}, "
@@ -162,6 +173,9 @@ def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args:
     method = getattr(multiworld.worlds[player], method_name)
     try:
         ret = _timed_call(method, *args, multiworld=multiworld, player=player)
+        if method_name not in _output_stages:
+            # worlds may place items, change rules or reclassify items without going through push_item
+            multiworld.invalidate_sphere_index()
     except Exception as e:
         message = f"Exception in {method} for player {player}, named {multiworld.player_name[player]}."
         if sys.version_info >= (3, 11, 0):
@@ -195,7 +209,9 @@ def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     for world_type in sorted(world_types, key=lambda world: world.__name__):
         stage_callable = getattr(world_type, f"stage_{method_name}", None)
         if stage_callable:
-            _timed_call(stage_callable, multiworld, *args)
+            _timed_call(stage_callable, multiworld, *args, multiworld=multiworld, game=world_type.game)
+            if method_name not in _output_stages:
+                multiworld.invalidate_sphere_index()
 
 
 class WebWorld(metaclass=WebWorldRegister):
@@ -289,6 +305,14 @@ class World(metaclass=AutoWorldRegister):
     hidden: ClassVar[bool] = False
     """Hide World Type from various views. Does not remove functionality."""
 
+    incremental_reachability: ClassVar[bool] = False
+    """
+    If True, collecting an item only retries the blocked Entrances of this world whose `item_dependencies` contain
+    that item's name, instead of every blocked Entrance. Entrances that leave `item_dependencies` as None are always
+    retried, and so is every blocked Entrance if anything but collecting items marked the player stale.
+    Only enable this if the declared dependencies are complete, otherwise reachability will be wrong.
+    """
+
     web: ClassVar[WebWorld] = WebWorld()
     """see WebWorld for options"""
 
@@ -0,0 +1,385 @@
+"""
+Declarative access rules, as an optional alternative to lambdas.
+
+Rules are built from Has, HasAll, HasAny, CanReach and plain CollectionRules, combined with & and |.
+They are callable like any other CollectionRule, but get compiled into a flat list of alternatives (a disjunction of
+conjunctions), which is checked without going through nested closures.
+add_rule combines declarative rules into a single rule instead of nesting them, which is compiled on first use.
+Requirements are checked in the order they are written in, so the rule added last is checked first, as with lambdas.
+
+    set_rule(location, Has("Sword", player) & (HasAny(("Bow", "Hookshot"), player) | Has("Bomb", player, 10)))
+"""
+import itertools
+import types
+import typing
+
+if typing.TYPE_CHECKING:
+    from BaseClasses import CollectionState
+
+    CollectionRule = typing.Callable[[CollectionState], bool]
+else:
+    CollectionRule = typing.Callable[[object], bool]
+
+__all__ = ("Rule", "Has", "HasAll", "HasAny", "CanReach", "Opaque", "And", "Or", "get_rule", "evaluate_rules")
+
+max_alternatives = 64
+"""Alternatives a rule may compile into. Parts of a rule that would exceed this are compiled separately."""
+
+
+class ItemCount(typing.NamedTuple):
+    """Requirement of count copies of item for player"""
+    player: int
+    item: str
+    count: int
+
+
+class Spot(typing.NamedTuple):
+    """Requirement of a reachable spot"""
+    spot: str
+    resolution_hint: str
+    player: int
+
+
+Requirements = typing.Tuple[typing.Union[ItemCount, Spot, CollectionRule], ...]
+"""
+One alternative of a compiled rule, all of its requirements have to be met. They are checked in the order they were
+written in, same as chained lambdas, so that cheap checks written first keep short-circuiting expensive ones.
+"""
+
+
+def merge(first: Requirements, second: Requirements) -> Requirements:
+    """All requirements of first and then second. An item needed more than once is checked once, for the most copies."""
+    counts: typing.Dict[typing.Tuple[int, str], int] = {}
+    for requirement in first + second:
+        if isinstance(requirement, ItemCount):
+            key = requirement.player, requirement.item
+            counts[key] = max(counts.get(key, 0), requirement.count)
+    merged: typing.Dict[typing.Union[ItemCount, Spot, CollectionRule], None] = {}
+    for requirement in first + second:
+        if isinstance(requirement, ItemCount):
+            requirement = ItemCount(requirement.player, requirement.item, counts[requirement.player, requirement.item])
+        merged[requirement] = None
+    return tuple(merged)
+
+
+def implies(first: Requirements, second: Requirements) -> bool:
+    """Whether meeting first always means meeting second as well."""
+    first_items = {(requirement.player, requirement.item): requirement.count
+                   for requirement in first if isinstance(requirement, ItemCount)}
+    first_others = set(first)
+    return all(first_items.get((requirement.player, requirement.item), 0) >= requirement.count
+               if isinstance(requirement, ItemCount) else requirement in first_others
+               for requirement in second)
+
+
+def simplify(alternatives: typing.Iterable[Requirements]) -> typing.Tuple[Requirements, ...]:
+    """Removes duplicate alternatives and those that already imply another one."""
+    alternatives = tuple(dict.fromkeys(alternatives))
+    return tuple(alternative for index, alternative in enumerate(alternatives)
+                 if not any(implies(alternative, other) and (other_index < index or not implies(other, alternative))
+                            for other_index, other in enumerate(alternatives) if other_index != index))
+
+
+def is_met(requirements: Requirements, state: "CollectionState") -> bool:
+    prog_items = state.prog_items
+    for requirement in requirements:
+        if isinstance(requirement, ItemCount):
+            if prog_items.get(requirement.player).get(requirement.item, 0) < requirement.count:
+                return False
+        elif isinstance(requirement, Spot):
+            if not state.can_reach(*requirement):
+                return False
+        elif not requirement(state):
+            return False
+    return True
+
+
+def build_evaluator(alternatives: typing.Tuple[Requirements, ...]) -> CollectionRule:
+    """Generates a single function checking all alternatives inline, to avoid a call per requirement."""
+    namespace: typing.Dict[str, typing.Any] = {}
+    players = sorted({requirement.player for requirements in alternatives for requirement in requirements
+                      if isinstance(requirement, ItemCount)})
+    lines = ["def evaluate(rule, state):"]
+    if players:
+        lines.append("    prog_items = state.prog_items")
+        lines.extend(f"    items_{player} = prog_items.get({player})" for player in players)
+    for requirements in alternatives:
+        conditions = []
+        for requirement in requirements:
+            if isinstance(requirement, ItemCount):
+                conditions.append(f"items_{requirement.player}.get({requirement.item!r}, 0) >= {requirement.count}")
+            elif isinstance(requirement, Spot):
+                name = f"spot_{len(namespace)}"
+                namespace[name] = requirement
+                conditions.append(f"state.can_reach(*{name})")
+            else:
+                name = f"rule_{len(namespace)}"
+                namespace[name] = requirement
+                conditions.append(f"{name}(state)")
+        if not conditions:
+            lines.append("    return True")
+            break
+        lines.append(f"    if {' and '.join(conditions)}:")
+        lines.append("        return True")
+    else:
+        lines.append("    return False")
+    exec(compile("\n".join(lines), "<declarative rule>", "exec"), namespace)
+    return namespace["evaluate"]
+
+
+class Rule:
+    """Base class of all declarative rules. Rules are immutable, combine them with & and |."""
+    _alternatives: typing.Optional[typing.Tuple[Requirements, ...]] = None
+    _evaluator: typing.Optional[CollectionRule] = None
+
+    def __and__(self, other: typing.Union["Rule", CollectionRule]) -> "Rule":
+        return And(self, other)
+
+    def __rand__(self, other: CollectionRule) -> "Rule":
+        return And(other, self)
+
+    def __or__(self, other: typing.Union["Rule", CollectionRule]) -> "Rule":
+        return Or(self, other)
+
+    def __ror__(self, other: CollectionRule) -> "Rule":
+        return Or(other, self)
+
+    def __call__(self, state: "CollectionState") -> bool:
+        evaluator = self._evaluator
+        if evaluator is None:
+            evaluator = self.get_evaluator()
+        return evaluator(state)
+
+    def get_evaluator(self) -> CollectionRule:
+        """
+        Returns the compiled function of this rule, bound to the rule, which saves a call over using the rule itself.
+        get_rule gets the rule back from it.
+        """
+        evaluator = self._evaluator
+        if evaluator is None:
+            evaluator = self._evaluator = types.MethodType(build_evaluator(self.compile()), self)
+        return evaluator
+
+    def bind(self, spot: typing.Any) -> CollectionRule:
+        """
+        Returns the access rule set_rule and add_rule assign to spot. It compiles this rule on its first call and puts
+        the compiled function from get_evaluator in its own place, so rules built up over many add_rule calls only get
+        compiled once. get_rule gets the rule back from it.
+        """
+        if self._evaluator is not None:
+            return self._evaluator
+
+        def compile_and_evaluate(rule: Rule, state: "CollectionState") -> bool:
+            evaluator = rule.get_evaluator()
+            if spot.access_rule is lazy_evaluator:
+                spot.access_rule = evaluator
+            return evaluator(state)
+
+        lazy_evaluator = types.MethodType(compile_and_evaluate, self)
+        return lazy_evaluator
+
+    def compile(self) -> typing.Tuple[Requirements, ...]:
+        """Returns the alternatives this rule is fulfilled by. Done on first call, but can be done ahead of time."""
+        alternatives = self._alternatives
+        if alternatives is None:
+            alternatives = self._alternatives = simplify(self._get_alternatives())
+        return alternatives
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        raise NotImplementedError
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        """Evaluates the rule as written instead of compiled, mostly useful to compare against."""
+        raise NotImplementedError
+
+    def evaluate_states(self, states: typing.Iterable["CollectionState"]) -> typing.List[bool]:
+        """Evaluates this rule for each of the states."""
+        return list(map(self.get_evaluator(), states))
+
+    @property
+    def item_names(self) -> typing.Optional[typing.FrozenSet[str]]:
+        """
+        Names of all items this rule checks for,
+        or None if it also depends on other things, such as reachability or other rules.
+        Can be used as Entrance.item_dependencies.
+        """
+        names: typing.Set[str] = set()
+        for requirements in self.compile():
+            for requirement in requirements:
+                if not isinstance(requirement, ItemCount):
+                    return None
+                names.add(requirement.item)
+        return frozenset(names)
+
+
+class Has(Rule):
+    """Same as state.has(item, player, count)"""
+    def __init__(self, item: str, player: int, count: int = 1) -> None:
+        self.item = item
+        self.player = player
+        self.count = count
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        yield ItemCount(self.player, self.item, self.count),
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return state.has(self.item, self.player, self.count)
+
+    def __repr__(self) -> str:
+        return f"Has({self.item!r}, {self.player}, {self.count})"
+
+
+class HasAll(Rule):
+    """Same as state.has_all(items, player)"""
+    def __init__(self, items: typing.Iterable[str], player: int) -> None:
+        self.items = tuple(items)
+        self.player = player
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        yield tuple(ItemCount(self.player, item, 1) for item in dict.fromkeys(self.items))
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return state.has_all(self.items, self.player)
+
+    def __repr__(self) -> str:
+        return f"HasAll({self.items!r}, {self.player})"
+
+
+class HasAny(Rule):
+    """Same as state.has_any(items, player)"""
+    def __init__(self, items: typing.Iterable[str], player: int) -> None:
+        self.items = tuple(items)
+        self.player = player
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        for item in dict.fromkeys(self.items):
+            yield ItemCount(self.player, item, 1),
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return state.has_any(self.items, self.player)
+
+    def __repr__(self) -> str:
+        return f"HasAny({self.items!r}, {self.player})"
+
+
+class CanReach(Rule):
+    """Same as state.can_reach(spot, resolution_hint, player). Entrances using it still need an indirect condition."""
+    def __init__(self, spot: str, resolution_hint: str, player: int) -> None:
+        self.spot = spot
+        self.resolution_hint = resolution_hint
+        self.player = player
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        yield Spot(self.spot, self.resolution_hint, self.player),
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return state.can_reach(self.spot, self.resolution_hint, self.player)
+
+    def __repr__(self) -> str:
+        return f"CanReach({self.spot!r}, {self.resolution_hint!r}, {self.player})"
+
+
+class Opaque(Rule):
+    """Wraps any other CollectionRule, so it can be combined with declarative rules."""
+    def __init__(self, rule: CollectionRule) -> None:
+        self.rule = rule
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        yield self.rule,
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return self.rule(state)
+
+    def __repr__(self) -> str:
+        return f"Opaque({self.rule!r})"
+
+
+def get_rule(rule: typing.Union[Rule, CollectionRule]) -> typing.Optional[Rule]:
+    """Returns the declarative rule behind an access rule, if it is one."""
+    if isinstance(rule, Rule):
+        return rule
+    rule = getattr(rule, "__self__", None)
+    return rule if isinstance(rule, Rule) else None
+
+
+def as_rule(rule: typing.Union[Rule, CollectionRule]) -> Rule:
+    return get_rule(rule) or Opaque(rule)
+
+
+class And(Rule):
+    """All of the rules have to be fulfilled."""
+    def __init__(self, *rules: typing.Union[Rule, CollectionRule]) -> None:
+        flattened: typing.List[Rule] = []
+        for rule in map(as_rule, rules):
+            flattened.extend(rule.rules if isinstance(rule, And) else (rule,))
+        self.rules = tuple(flattened)
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        alternatives: typing.Tuple[Requirements, ...] = ((),)
+        for rule in self.rules:
+            rule_alternatives = rule.compile()
+            if len(alternatives) * len(rule_alternatives) > max_alternatives:
+                # keep the bigger one as a separate rule instead of multiplying it out
+                if len(rule_alternatives) > len(alternatives):
+                    rule_alternatives = ((rule,),)
+                else:
+                    alternatives = ((Compiled(alternatives),),)
+            alternatives = simplify(merge(first, second) for first in alternatives for second in rule_alternatives)
+        return alternatives
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return all(rule.evaluate(state) for rule in self.rules)
+
+    def __repr__(self) -> str:
+        return f"And{self.rules!r}"
+
+
+class Or(Rule):
+    """Any of the rules has to be fulfilled."""
+    def __init__(self, *rules: typing.Union[Rule, CollectionRule]) -> None:
+        flattened: typing.List[Rule] = []
+        for rule in map(as_rule, rules):
+            flattened.extend(rule.rules if isinstance(rule, Or) else (rule,))
+        self.rules = tuple(flattened)
+
+    def _get_alternatives(self) -> typing.Iterable[Requirements]:
+        for rule in self.rules:
+            yield from rule.compile()
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return any(rule.evaluate(state) for rule in self.rules)
+
+    def __repr__(self) -> str:
+        return f"Or{self.rules!r}"
+
+
+class Compiled(Rule):
+    """Already compiled alternatives, used for parts of rules that are kept separate."""
+    def __init__(self, alternatives: typing.Tuple[Requirements, ...]) -> None:
+        self._alternatives = alternatives
+
+    def evaluate(self, state: "CollectionState") -> bool:
+        return self(state)
+
+    def __repr__(self) -> str:
+        return f"Compiled({self._alternatives!r})"
+
+
+def evaluate_rules(rules: typing.Iterable[Rule], state: "CollectionState") -> typing.List[bool]:
+    """
+    Evaluates many rules against the same state. Each distinct requirement is only checked once,
+    so this is cheaper than calling each rule on its own for rules that share parts, like a world's dungeon keys.
+    """
+    met: typing.Dict[Requirements, bool] = {}
+    results: typing.List[bool] = []
+    for rule in rules:
+        result = False
+        for requirements in rule.compile():
+            requirements_met = met.get(requirements)
+            if requirements_met is None:
+                requirements_met = met[requirements] = is_met(requirements, state)
+            if requirements_met:
+                result = True
+                break
+        results.append(result)
+    return results
@@ -3,6 +3,7 @@ import logging
 import typing
 
 from BaseClasses import LocationProgressType, MultiWorld, Location, Region, Entrance
+from .DeclarativeRules import And, Or, Rule, get_rule
 
 if typing.TYPE_CHECKING:
     import BaseClasses
@@ -97,14 +98,18 @@ def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typi
 
 
 def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule):
-    spot.access_rule = rule
+    spot.access_rule = rule.bind(spot) if isinstance(rule, Rule) else rule
 
 
 def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule, combine="and"):
     old_rule = spot.access_rule
     # empty rule, replace instead of add
     if old_rule is spot.__class__.access_rule:
-        spot.access_rule = rule if combine == "and" else old_rule
+        if combine == "and":
+            set_rule(spot, rule)
+    elif isinstance(rule, Rule) or get_rule(old_rule):
+        # declarative rules get combined into one flat rule instead of nesting calls
+        set_rule(spot, And(rule, old_rule) if combine == "and" else Or(rule, old_rule))
     else:
         if combine == "and":
             spot.access_rule = lambda state: rule(state) and old_rule(state)